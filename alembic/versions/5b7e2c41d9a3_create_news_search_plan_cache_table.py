@@ -0,0 +1,45 @@
+"""create_news_search_plan_cache_table
+
+Revision ID: 5b7e2c41d9a3
+Revises: acf7562b405f
+Create Date: 2025-07-12 10:14:32.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2c41d9a3'
+down_revision: Union[str, Sequence[str], None] = 'acf7562b405f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    # Create news_search_plan_cache table
+    op.create_table(
+        'news_search_plan_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('query_prompt', sa.Text(), nullable=False),
+        sa.Column('search_plans', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Width of the default embedding model, as the model's query_embedding column
+    op.execute("ALTER TABLE news_search_plan_cache ADD COLUMN query_embedding vector(768) NOT NULL")
+    op.create_index(op.f('ix_news_search_plan_cache_id'), 'news_search_plan_cache', ['id'], unique=False)
+    op.execute("CREATE INDEX ix_news_search_plan_cache_query_embedding ON news_search_plan_cache USING hnsw (query_embedding vector_cosine_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Drop news_search_plan_cache table
+    op.drop_index('ix_news_search_plan_cache_query_embedding', table_name='news_search_plan_cache')
+    op.drop_index(op.f('ix_news_search_plan_cache_id'), table_name='news_search_plan_cache')
+    op.drop_table('news_search_plan_cache')
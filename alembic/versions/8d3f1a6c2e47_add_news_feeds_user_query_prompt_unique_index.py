@@ -0,0 +1,33 @@
+"""add_news_feeds_user_query_prompt_unique_index
+
+Revision ID: 8d3f1a6c2e47
+Revises: 5b7e2c41d9a3
+Create Date: 2025-07-14 09:41:07.362815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3f1a6c2e47'
+down_revision: Union[str, Sequence[str], None] = '5b7e2c41d9a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'uq_news_feeds_user_id_query_prompt',
+        'news_feeds',
+        ['user_id', sa.text('md5(query_prompt)')],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_news_feeds_user_id_query_prompt', table_name='news_feeds')
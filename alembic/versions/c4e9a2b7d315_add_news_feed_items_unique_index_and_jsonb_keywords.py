@@ -0,0 +1,58 @@
+"""add_news_feed_items_unique_index_and_jsonb_keywords
+
+Revision ID: c4e9a2b7d315
+Revises: 8d3f1a6c2e47
+Create Date: 2025-07-15 10:12:43.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a2b7d315'
+down_revision: Union[str, Sequence[str], None] = '8d3f1a6c2e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Remove duplicate feed items, keeping the first one, before enforcing uniqueness
+    op.execute("""
+        DELETE FROM news_feed_items duplicate
+        USING news_feed_items original
+        WHERE duplicate.news_feed_id = original.news_feed_id
+          AND duplicate.news_article_id = original.news_article_id
+          AND duplicate.id > original.id
+    """)
+    op.create_index(
+        'uq_news_feed_items_news_feed_id_news_article_id',
+        'news_feed_items',
+        ['news_feed_id', 'news_article_id'],
+        unique=True
+    )
+    op.alter_column(
+        'news_articles',
+        'keywords',
+        existing_type=sa.Text(),
+        type_=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using='keywords::jsonb'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'news_articles',
+        'keywords',
+        existing_type=postgresql.JSONB(),
+        type_=sa.Text(),
+        existing_nullable=True,
+        postgresql_using='keywords::text'
+    )
+    op.drop_index('uq_news_feed_items_news_feed_id_news_article_id', table_name='news_feed_items')
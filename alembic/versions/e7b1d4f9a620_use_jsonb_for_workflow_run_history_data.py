@@ -0,0 +1,61 @@
+"""use_jsonb_for_workflow_run_history_data
+
+Revision ID: e7b1d4f9a620
+Revises: c4e9a2b7d315
+Create Date: 2025-07-15 14:36:20.104957
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b1d4f9a620'
+down_revision: Union[str, Sequence[str], None] = 'c4e9a2b7d315'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        'workflow_run_history',
+        'input_data',
+        existing_type=sa.Text(),
+        type_=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using='input_data::jsonb'
+    )
+    op.alter_column(
+        'workflow_run_history',
+        'output_data',
+        existing_type=sa.Text(),
+        type_=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using='output_data::jsonb'
+    )
+    op.create_index(op.f('ix_workflow_run_history_status'), 'workflow_run_history', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_workflow_run_history_status'), table_name='workflow_run_history')
+    op.alter_column(
+        'workflow_run_history',
+        'output_data',
+        existing_type=postgresql.JSONB(),
+        type_=sa.Text(),
+        existing_nullable=True,
+        postgresql_using='output_data::text'
+    )
+    op.alter_column(
+        'workflow_run_history',
+        'input_data',
+        existing_type=postgresql.JSONB(),
+        type_=sa.Text(),
+        existing_nullable=False,
+        postgresql_using='input_data::text'
+    )
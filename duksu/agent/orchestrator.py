@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+
+from duksu.config import CONFIG
+from duksu.logging_config import create_logger
+
+
+T = TypeVar("T")
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether the error is a provider rate limit rejection (HTTP 429), across the supported LLM providers."""
+    if type(error).__name__ in ("RateLimitError", "ResourceExhausted", "TooManyRequests"):
+        return True
+    return getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429
+
+
+class LMOrchestrator:
+    """
+    Runs language model calls with a cap on the calls in flight, retrying rate limited calls with exponential backoff.
+    """
+
+    def __init__(self, max_concurrency: int, max_retries: int):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.logger = create_logger("LMOrchestrator")
+
+        # The semaphore is bound to the event loop it is first used in, so it is recreated for each new loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _log_retry(self, retry_state: Any) -> None:
+        self.logger.warning(f"LLM call rate limited, retrying (attempt {retry_state.attempt_number}/{self.max_retries + 1}): {retry_state.outcome.exception()}")
+
+    async def call(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        async for attempt in AsyncRetrying(
+            retry=retry_if_exception(is_rate_limit_error),
+            wait=wait_exponential_jitter(initial=1, max=60),
+            stop=stop_after_attempt(self.max_retries + 1),
+            before_sleep=self._log_retry,
+            reraise=True,
+        ):
+            with attempt:
+                # Hold a slot only while calling, so backing off does not block other calls
+                async with self._get_semaphore():
+                    return await fn(*args, **kwargs)
+
+        raise AssertionError("unreachable")
+
+
+_orchestrator: Optional[LMOrchestrator] = None
+
+
+def get_lm_orchestrator() -> LMOrchestrator:
+    """Get the orchestrator shared by all LLM call sites, so the concurrency cap applies process wide."""
+    global _orchestrator
+    if _orchestrator is None:
+        _orchestrator = LMOrchestrator(CONFIG.LLM_MAX_CONCURRENCY, CONFIG.LLM_MAX_RETRIES)
+    return _orchestrator
@@ -1,4 +1,5 @@
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from enum import Enum
 from pydantic import BaseModel, Field
 from langchain.schema.language_model import BaseLanguageModel
@@ -21,8 +22,23 @@ class Message(BaseModel):
     metadata: MessageMetadata
 
 
+@lru_cache(maxsize=1)
+def get_token_encoding() -> tiktoken.Encoding:
+    """Get the shared tokenizer, loaded on first use."""
+    return tiktoken.encoding_for_model("gpt-4")
+
+
 def count_tokens(text: str, model_name: Optional[str] = None) -> int:
-    return len(tiktoken.encoding_for_model("gpt-4").encode(text))
+    return len(get_token_encoding().encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> Tuple[str, int]:
+    """Truncate text to at most max_tokens tokens, returning the text and its original token count."""
+    encoding = get_token_encoding()
+    token_ids = encoding.encode(text)
+    if len(token_ids) > max_tokens:
+        text = encoding.decode(token_ids[:max_tokens])
+    return text, len(token_ids)
 
 
 class SystemPrompt:
@@ -69,6 +85,14 @@ class AIPrompt:
 
         return metadata
     
+    def copy(self) -> "AIPrompt":
+        """Copy the prompt with its messages so far, without recounting their tokens."""
+        prompt = AIPrompt.__new__(AIPrompt)
+        prompt.system_prompt = self.system_prompt
+        prompt.messages = list(self.messages)
+        prompt.model_name = self.model_name
+        return prompt
+
     def add_task_prompt(self, message: str) -> MessageMetadata:
         formatted_message = f"<Your current task>\n{message}\n</Your current task>"
         return self._add_message(formatted_message, MessageType.TASK)
@@ -1,10 +1,14 @@
-from typing import Optional
+from functools import cached_property, lru_cache
+from typing import Any, Optional
 import os
 import sys
+import threading
+from cachetools import LRUCache
 import langchain_openai
 import langchain_anthropic
 import langchain_google_genai
 import langchain_ollama
+from langchain_core.language_models import BaseLanguageModel
 from langchain_core.rate_limiters import InMemoryRateLimiter
 from dotenv import load_dotenv
 
@@ -12,66 +16,106 @@ load_dotenv()
 
 
 class Config:
-    """configuration class for environment variable"""
+    """configuration class for environment variable, each value is read once on first access"""
 
     # Logging
-    @property
+    @cached_property
     def LOG_LEVEL(self) -> str:
         return os.getenv('LOG_LEVEL', 'info')
 
     # LLM Settings
-    @property
+    @cached_property
     def MODEL_NAME(self) -> str:
         return os.getenv('MODEL_NAME', 'gemini-2.5-flash-preview-04-17')
 
-    @property
+    @cached_property
     def OPENAI_API_KEY(self) -> Optional[str]:
         return os.getenv('OPENAI_API_KEY')
 
-    @property
+    @cached_property
     def ANTHROPIC_API_KEY(self) -> Optional[str]:
         return os.getenv('ANTHROPIC_API_KEY')
 
-    @property
+    @cached_property
     def GEMINI_API_KEY(self) -> Optional[str]:
         return os.getenv('GEMINI_API_KEY')
 
-    @property
+    @cached_property
     def OLLAMA_BASE_URL(self) -> str:
         return os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
 
+    @cached_property
+    def LLM_MAX_CONCURRENCY(self) -> int:
+        return int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+
+    @cached_property
+    def LLM_MAX_RETRIES(self) -> int:
+        return int(os.getenv('LLM_MAX_RETRIES', '5'))
+
+    # Embedding Settings
+    @cached_property
+    def EMBEDDING_MODEL_NAME(self) -> str:
+        return os.getenv('EMBEDDING_MODEL_NAME', 'models/text-embedding-004')
+
+    # Embeddings of another size than 768 skip the news search plan cache, whose embedding column has that width
+    @cached_property
+    def EMBEDDING_DIMENSIONS(self) -> int:
+        return int(os.getenv('EMBEDDING_DIMENSIONS', '768'))
+
     # News Collection Settings
-    @property
+    @cached_property
     def ARTICLE_COLLECTION_AGE_CAP(self) -> str:
         return os.getenv('ARTICLE_COLLECTION_AGE_CAP', '30d')
 
-    @property
+    @cached_property
+    def GOOGLE_NEWS_DECODE_CONCURRENCY(self) -> int:
+        return int(os.getenv('GOOGLE_NEWS_DECODE_CONCURRENCY', '8'))
+
+    @cached_property
     def ARTICLE_REGISTRY_MAX_NEWS_SOURCES(self) -> int:
         return int(os.getenv('ARTICLE_REGISTRY_MAX_NEWS_SOURCES', '3'))
 
-    @property
+    @cached_property
     def ARTICLE_KEYWORDS_MIN_COUNT(self) -> int:
         return int(os.getenv('ARTICLE_KEYWORDS_MIN_COUNT', '1'))
 
-    @property
+    @cached_property
     def ARTICLE_KEYWORDS_MAX_COUNT(self) -> int:
         return int(os.getenv('ARTICLE_KEYWORDS_MAX_COUNT', '3'))
 
-    @property
+    @cached_property
     def ARTICLE_SUMMARY_MIN_WORD_COUNT(self) -> int:
         return int(os.getenv('ARTICLE_SUMMARY_MIN_WORD_COUNT', '100'))
 
-    @property
+    @cached_property
     def ARTICLE_SUMMARY_MAX_WORD_COUNT(self) -> int:
         return int(os.getenv('ARTICLE_SUMMARY_MAX_WORD_COUNT', '150'))
 
+    @cached_property
+    def ARTICLE_CONTENT_MAX_TOKENS(self) -> int:
+        return int(os.getenv('ARTICLE_CONTENT_MAX_TOKENS', '8000'))
+
 
 CONFIG = Config()
 
 
 def get_llm(model_name: Optional[str] = None, temperature: float = 0.0, rate_limiter: Optional[InMemoryRateLimiter] = None):
-    """Get the language model based on config."""
+    """Get the language model based on config, shared between callers unless a rate limiter is given."""
+
+    if rate_limiter is None:
+        return _get_shared_llm(model_name, temperature)
+    return _create_llm(model_name, temperature, rate_limiter)
 
+
+# Prompts that start with the same static system prompt and instructions (see RelevanceScorer) let providers with
+# prompt caching skip the shared prefix: OpenAI and Gemini cache long prefixes automatically, while Anthropic
+# only does so for prompts marked with cache_control
+@lru_cache(maxsize=8)
+def _get_shared_llm(model_name: Optional[str], temperature: float):
+    return _create_llm(model_name, temperature, None)
+
+
+def _create_llm(model_name: Optional[str], temperature: float, rate_limiter: Optional[InMemoryRateLimiter]):
     model_name = model_name or CONFIG.MODEL_NAME or "gemini-2.5-flash-preview-04-17"
 
     # Set environment variables if they're in the config but not in the environment
@@ -115,4 +159,49 @@ def get_llm(model_name: Optional[str] = None, temperature: float = 0.0, rate_lim
         raise ValueError(f"Unsupported model: {model_name}.")
 
 
-__all__ = ["CONFIG", "get_llm"]
+# Structured output runnables by (language model id, schema), holding the model so its id is not reused
+_structured_output_models: LRUCache = LRUCache(maxsize=16)
+_structured_output_models_lock = threading.Lock()
+
+
+def get_structured_output_model(llm: BaseLanguageModel, schema: Any):
+    """Get the structured output runnable of the language model for the schema, built once per model and schema."""
+
+    key = (id(llm), schema)
+    with _structured_output_models_lock:
+        cached = _structured_output_models.get(key)
+    if cached is not None and cached[0] is llm:
+        return cached[1]
+
+    structured_output_model = llm.with_structured_output(schema)  # type: ignore
+    with _structured_output_models_lock:
+        _structured_output_models[key] = (llm, structured_output_model)
+    return structured_output_model
+
+
+def get_embedding_model(model_name: Optional[str] = None):
+    """
+    Get the text embedding model based on config, shared between callers.
+    Raises ValueError rather than exiting if the model is unsupported or its API key is missing, as embeddings are optional.
+    """
+
+    return _get_shared_embedding_model(model_name or CONFIG.EMBEDDING_MODEL_NAME)
+
+
+@lru_cache(maxsize=4)
+def _get_shared_embedding_model(model_name: str):
+    if model_name.startswith('text-embedding'):
+        if not CONFIG.OPENAI_API_KEY:
+            raise ValueError("OpenAI API key not found, set OPENAI_API_KEY to use the embedding model")
+        return langchain_openai.OpenAIEmbeddings(model=model_name, dimensions=CONFIG.EMBEDDING_DIMENSIONS, api_key=CONFIG.OPENAI_API_KEY)
+    elif model_name.startswith('models/') or model_name.startswith('gemini'):
+        if not CONFIG.GEMINI_API_KEY:
+            raise ValueError("Google API key not found, set GEMINI_API_KEY to use the embedding model")
+        return langchain_google_genai.GoogleGenerativeAIEmbeddings(model=model_name, google_api_key=CONFIG.GEMINI_API_KEY)
+    elif model_name.startswith('ollama-'):
+        return langchain_ollama.OllamaEmbeddings(model=model_name[7:], base_url=CONFIG.OLLAMA_BASE_URL)
+    else:
+        raise ValueError(f"Unsupported embedding model: {model_name}.")
+
+
+__all__ = ["CONFIG", "get_llm", "get_structured_output_model", "get_embedding_model"]
@@ -1,10 +1,12 @@
 import asyncio
+import heapq
 from typing import List, Literal, Optional, Dict, Any, Tuple
 from langchain.schema.language_model import BaseLanguageModel
 from pydantic import BaseModel, Field
 
+from duksu.config import get_structured_output_model
 from duksu.feed.scorer import RelevanceScorer, Score
-from duksu.news.model import NewsArticle
+from duksu.news.model import NewsArticle, drop_duplicate_articles
 from duksu.feed.model import NewsCuration, NewsCurationItem
 from duksu.logging_config import create_logger
 from duksu.agent.prompts import AIPrompt, SystemPrompt
@@ -22,7 +24,7 @@ class FeedCurator:
     
     def __init__(self, llm: BaseLanguageModel, system_prompt: Optional[SystemPrompt] = None):
         self.llm = llm
-        self.curator = llm.with_structured_output(CurationResult)
+        self.curator = get_structured_output_model(llm, CurationResult)
         self.system_prompt = system_prompt or SystemPrompt()
         self.logger = create_logger("FeedCurator")
         
@@ -32,48 +34,101 @@ class FeedCurator:
     def _filter_by_score(self, articles_with_scores: List[Tuple[NewsArticle, Score]], min_score: float) -> List[Tuple[NewsArticle, Score]]:
         return [article_with_score for article_with_score in articles_with_scores if article_with_score[1].score >= min_score]
 
+    async def _score_batch(self, batch: List[NewsArticle], query_prompt: str, batch_number: int, batch_count: int) -> Tuple[int, Optional[List[Tuple[NewsArticle, Score]]]]:
+        """Score the batch, returning None as its scores if scoring failed, the failure being logged here only."""
+        # The scoring requests in flight are capped by the LLM orchestrator, across all curations of the process
+        self.logger.debug(f"Scoring batch ({batch_number}/{batch_count}) of {len(batch)} articles")
+
+        try:
+            scorer_response = await self.relevancy_scorer.ascore_articles(batch, query_prompt)
+        except Exception as e:
+            self.logger.error(f"Failed to score batch ({batch_number}/{batch_count}), its {len(batch)} articles are left out of the curation: {e}")
+            return batch_number, None
+
+        return batch_number, list(zip(batch, scorer_response.scores))
+
     async def curate_news_feed(
         self,
         query_prompt: str,
         articles: List[NewsArticle],
         min_relevance_score: float,
         max_articles_per_batch: Optional[int] = None,        
+        top_k: Optional[int] = None,
     ) -> NewsCuration:
         """
         Curate a news feed from a list of articles based on a query prompt.
+        If top_k is given, only the top_k most relevant articles are kept, and scoring stops early
+        once top_k perfectly relevant articles have been found.
         """
         assert query_prompt.strip() != ""
 
+        # Score each article once even if it was collected from several sources or under variants of its URL
+        unique_articles = drop_duplicate_articles(articles)
+        if len(unique_articles) < len(articles):
+            self.logger.debug(f"Dropped {len(articles) - len(unique_articles)} duplicate articles by normalized URL")
+        articles = unique_articles
+
         self.logger.info(f"Starting news curation job; query_prompt: \"{query_prompt[:100]}\"; considering {len(articles)} articles; articles per batch: {max_articles_per_batch}")
 
         try:
             relevant_articles: List[Tuple[NewsArticle, Score]] = []
             articles_batches = [articles] if max_articles_per_batch is None else [articles[i:i + max_articles_per_batch] for i in range(0, len(articles), max_articles_per_batch)]
 
-            count = 0
-            for batch in articles_batches:
-                count += 1
-                self.logger.debug(f"Scoring batch ({count}/{len(articles_batches)}) of {len(batch)} articles")
-                
-                scorer_response = self.relevancy_scorer.score_articles(batch, query_prompt)
-                articles_with_scores = list(zip(batch, scorer_response.scores))
+            tasks = [
+                asyncio.create_task(self._score_batch(batch, query_prompt, i, len(articles_batches)))
+                for i, batch in enumerate(articles_batches, 1)
+            ]
+
+            # Relevant articles per batch number, so the results keep the input order regardless of completion order
+            relevant_articles_by_batch: Dict[int, List[Tuple[NewsArticle, Score]]] = {}
+            failed_batch_count = 0
+            unscored_article_count = 0
+            perfect_score_count = 0
+            try:
+                for completed in asyncio.as_completed(tasks):
+                    batch_number, articles_with_scores = await completed
+                    if articles_with_scores is None:
+                        failed_batch_count += 1
+                        unscored_article_count += len(articles_batches[batch_number - 1])
+                        continue
+
+                    # Filtering by score criteria
+                    relevant_articles_in_batch = self._filter_by_score(articles_with_scores, min_relevance_score)
+
+                    self.logger.debug(f"Found {len(relevant_articles_in_batch)} relevant articles in batch ({batch_number}/{len(articles_batches)})")
+
+                    relevant_articles_by_batch[batch_number] = relevant_articles_in_batch
+
+                    perfect_score_count += sum(1 for _, score in relevant_articles_in_batch if score.score >= 1.0)
+                    if top_k is not None and perfect_score_count >= top_k:
+                        self.logger.info(f"Found {perfect_score_count} perfectly relevant articles, skipping remaining batches")
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
 
-                # Filtering by score criteria
-                relevant_articles_in_batch = self._filter_by_score(articles_with_scores, min_relevance_score)
+            if failed_batch_count and failed_batch_count == len(tasks):
+                raise ValueError(f"Failed to score all {failed_batch_count} batches of articles")
 
-                self.logger.debug(f"Found {len(relevant_articles_in_batch)} relevant articles in batch")
+            if failed_batch_count:
+                self.logger.warning(f"Curation is partial, {unscored_article_count} articles in {failed_batch_count} of {len(tasks)} batches could not be scored")
 
-                relevant_articles.extend(relevant_articles_in_batch)
+            for batch_number in sorted(relevant_articles_by_batch):
+                relevant_articles.extend(relevant_articles_by_batch[batch_number])
             
             if not relevant_articles:
                 self.logger.warning("No articles met the minimum relevance criteria")
                 return NewsCuration(
                     query_prompt=query_prompt,
-                    items=[]
+                    items=[],
+                    unscored_article_count=unscored_article_count
                 )
 
-            # Sort articles by relevance score in descending order
-            relevant_articles.sort(key=lambda x: x[1].score, reverse=True)
+            # Sort articles by relevance score in descending order, only selecting the top k if capped
+            if top_k is not None:
+                relevant_articles = heapq.nlargest(top_k, relevant_articles, key=lambda x: x[1].score)
+            else:
+                relevant_articles.sort(key=lambda x: x[1].score, reverse=True)
             
             curation_items = []
             for article, relevance_score in relevant_articles:
@@ -89,7 +144,8 @@ class FeedCurator:
             
             return NewsCuration(
                 query_prompt=query_prompt,
-                items=curation_items
+                items=curation_items,
+                unscored_article_count=unscored_article_count
             )
             
         except Exception as e:
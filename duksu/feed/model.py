@@ -5,15 +5,21 @@ from datetime import datetime
 from duksu.news.model import NewsArticle
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NewsCurationItem:
     """A feed item containing an article with its metadata and scores."""
     item: NewsArticle
     scores: Dict[str, Any] = field(default_factory=dict)  # For now contains relevance score
 
 
-@dataclass
+@dataclass(slots=True)
 class NewsCuration:
     """Curated news feed with a query prompt and a list of scored items."""
     query_prompt: str
-    items: List[NewsCurationItem] = field(default_factory=list)
\ No newline at end of file
+    items: List[NewsCurationItem] = field(default_factory=list)
+    unscored_article_count: int = 0  # Articles left out as their scoring failed
+
+    @property
+    def is_partial(self) -> bool:
+        """Whether some articles could not be scored, so the curation only considered the others."""
+        return self.unscored_article_count > 0
\ No newline at end of file
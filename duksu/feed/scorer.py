@@ -1,10 +1,16 @@
 import asyncio
+import hashlib
+import re
+import threading
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import Any, List, Tuple, Optional
+from cachetools import LRUCache
 from langchain.schema.language_model import BaseLanguageModel
 from pydantic import BaseModel, Field
 
+from duksu.config import get_structured_output_model
 from duksu.news.model import NewsArticle
+from duksu.agent.orchestrator import get_lm_orchestrator
 from duksu.agent.prompts import AIPrompt, SystemPrompt
 
 
@@ -21,39 +27,15 @@ class ScorerResponse(BaseModel):
     scores: List[Score] = Field(description="List of score results for the articles")
 
 
-class RelevanceScorer:
-    """
-    Scorer interface for evaluating article relevance to query prompts.
-    """
-    
-    def __init__(self, llm_model: BaseLanguageModel, system_prompt: Optional[SystemPrompt] = None):
-        self.relevance_scorer = llm_model.with_structured_output(ScorerResponse)
-        self.system_prompt = system_prompt or SystemPrompt()
-    
-    def score_articles(
-        self, 
-        articles: List[NewsArticle], 
-        query_prompt: str
-    ) -> ScorerResponse:
-        articles_content = ""
-        for i, article in enumerate(articles, 1):
-            articles_content += f"Article: {i}\n"
-            if article.title: articles_content += f"Title: {article.title}\n"
-            if article.source: articles_content += f"Source: {article.source}\n"
-            if article.summary: articles_content += f"Summary: {article.summary}\n"
-            if article.keywords: articles_content += f"Keywords: {', '.join(article.keywords)}\n"
-            articles_content += "\n"
+_NON_WORD_CHARACTERS = re.compile(r"[^\w]+")
 
-        prompt = AIPrompt(self.system_prompt)
-        prompt.add_task_prompt(f"""
-Score the relevance of these {len(articles)} news articles to the user's personalized news feed query.
+# Static scoring instructions, kept ahead of the per-call query and articles so that every scoring prompt
+# shares a byte-identical prefix that providers with prompt caching can reuse
+_SCORING_INSTRUCTIONS = """
+Score the relevance of the news articles below to the user's personalized news feed query.
 
 The user has requested a curated news feed based on their interests and information needs. Their query represents what topics, themes, or types of news coverage they want to stay informed about.
 
-User's News Feed Query: {query_prompt}
-
-{articles_content}
-
 For each article, provide a relevance score from 0.0 to 1.0, using the following crtieria to determine approximately one of these values:
 
 - 1.0 = Perfectly relevant - Directly addresses the user's query with high-quality, engaging content
@@ -69,14 +51,95 @@ Consider these factors when scoring:
 4. Source credibility - Is this from a reputable source?
 5. Keyword alignment - How well do article keywords match the query intent?
 
-Return result of EXACTLY {len(articles)} scores in the same order as the articles above. Each score should include clear reasoning explaining why that specific score was chosen.
-""")
-        
-        result = self.relevance_scorer.invoke(prompt.get_prompt())
-        
+Return result of EXACTLY one score per article in the same order as the articles. Each score should include clear reasoning explaining why that specific score was chosen.
+"""
+
+_SCORING_INPUT_TEMPLATE = """
+User's News Feed Query: {query_prompt}
+
+Articles to score ({article_count}):
+
+{articles_content}"""
+
+
+class RelevanceScorer:
+    """
+    Scorer interface for evaluating article relevance to query prompts.
+    """
+
+    # Scores of previously seen (model, query prompt, article) combinations, shared across scorer instances
+    _score_cache: LRUCache[str, Score] = LRUCache(maxsize=4096)
+    _score_cache_lock = threading.Lock()
+    
+    def __init__(self, llm_model: BaseLanguageModel, system_prompt: Optional[SystemPrompt] = None):
+        self.relevance_scorer = get_structured_output_model(llm_model, ScorerResponse)
+        self.system_prompt = system_prompt or SystemPrompt()
+        self.prompt_prefix = AIPrompt(self.system_prompt)
+        self.orchestrator = get_lm_orchestrator()
+        self.model_name = getattr(llm_model, "model_name", None) or getattr(llm_model, "model", None) or type(llm_model).__name__
+
+    def _score_cache_key(self, article: NewsArticle, query_prompt: str) -> str:
+        # Normalize whitespace and punctuation so near-identical summaries share a cache entry
+        summary = _NON_WORD_CHARACTERS.sub(" ", article.summary or "").strip().lower()
+        return hashlib.sha256(f"{self.model_name}|{query_prompt}|{article.url}|{article.title}|{summary}".encode()).hexdigest()
+
+    def _get_cached_scores(self, articles: List[NewsArticle], query_prompt: str) -> Tuple[List[str], List[Optional[Score]]]:
+        keys = [self._score_cache_key(article, query_prompt) for article in articles]
+        with self._score_cache_lock:
+            return keys, [self._score_cache.get(key) for key in keys]
+
+    def _merge_scores(self, keys: List[str], cached_scores: List[Optional[Score]], new_scores: List[Score]) -> ScorerResponse:
+        new_scores_iter = iter(new_scores)
+        scores = []
+        with self._score_cache_lock:
+            for key, cached_score in zip(keys, cached_scores):
+                if cached_score is None:
+                    cached_score = next(new_scores_iter)
+                    self._score_cache[key] = cached_score
+                scores.append(cached_score)
+        return ScorerResponse(scores=scores)
+    
+    def _build_prompt(self, articles: List[NewsArticle], query_prompt: str) -> AIPrompt:
+        articles_content_parts: List[str] = []
+        for i, article in enumerate(articles, 1):
+            articles_content_parts.append(f"Article: {i}\n")
+            if article.title: articles_content_parts.append(f"Title: {article.title}\n")
+            if article.source: articles_content_parts.append(f"Source: {article.source}\n")
+            if article.summary: articles_content_parts.append(f"Summary: {article.summary}\n")
+            if article.keywords: articles_content_parts.append(f"Keywords: {', '.join(article.keywords)}\n")
+            articles_content_parts.append("\n")
+        articles_content = "".join(articles_content_parts)
+
+        prompt = self.prompt_prefix.copy()
+        prompt.add_task_prompt(_SCORING_INSTRUCTIONS + _SCORING_INPUT_TEMPLATE.format_map({
+            "article_count": len(articles),
+            "query_prompt": query_prompt,
+            "articles_content": articles_content,
+        }))
+        return prompt
+
+    def _validate_response(self, result: Any, articles: List[NewsArticle]) -> ScorerResponse:
         if isinstance(result, ScorerResponse):
             if len(result.scores) != len(articles):
                 raise ValueError(f"Expected {len(articles)} scores, but got {len(result.scores)}")
             return result
         else:
-            raise ValueError(f"Unexpected scoring response: {type(result)}")
\ No newline at end of file
+            raise ValueError(f"Unexpected scoring response: {type(result)}")
+
+    async def ascore_articles(
+        self, 
+        articles: List[NewsArticle], 
+        query_prompt: str
+    ) -> ScorerResponse:
+        keys, cached_scores = self._get_cached_scores(articles, query_prompt)
+        uncached_articles = [article for article, score in zip(articles, cached_scores) if score is None]
+
+        new_scores: List[Score] = []
+        if uncached_articles:
+            prompt = self._build_prompt(uncached_articles, query_prompt)
+
+            result = await self.orchestrator.call(self.relevance_scorer.ainvoke, prompt.get_prompt())
+
+            new_scores = self._validate_response(result, uncached_articles).scores
+
+        return self._merge_scores(keys, cached_scores, new_scores)
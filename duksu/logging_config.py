@@ -1,18 +1,22 @@
+from functools import lru_cache
 import logging
 import sys
 from duksu.config import CONFIG
 
 
+_LOG_LEVEL = getattr(logging, CONFIG.LOG_LEVEL.upper())
+
+
+@lru_cache(maxsize=None)
 def configure_logger(name: str = "duksu"):
-    """Configure and return the logger for the application."""
+    """Configure and return the logger for the application, once per logger name."""
     logger = logging.getLogger(name)
-    log_level = getattr(logging, CONFIG.LOG_LEVEL.upper())
-    logger.setLevel(log_level)
+    logger.setLevel(_LOG_LEVEL)
     
-    # Only add handler if it doesn't already exist (avoid duplicate handlers)
+    # Only add handler if it doesn't already exist (avoid duplicate handlers when this module is reloaded)
     if not logger.handlers:
         handler = logging.StreamHandler(sys.stdout)
-        handler.setLevel(log_level)
+        handler.setLevel(_LOG_LEVEL)
         
         # Create formatter
         formatter = logging.Formatter(
@@ -32,7 +36,19 @@ def create_logger(module_name: str):
     return logger
 
 
+def set_log_level(level: int):
+    """Set the level of the duksu loggers and their handlers, both the ones already configured and the ones created later."""
+    global _LOG_LEVEL
+    _LOG_LEVEL = level
+
+    for name, existing_logger in logging.Logger.manager.loggerDict.items():
+        if (name == "duksu" or name.startswith("duksu.")) and isinstance(existing_logger, logging.Logger):
+            existing_logger.setLevel(level)
+            for handler in existing_logger.handlers:
+                handler.setLevel(level)
+
+
 # Initialize the main logger
 logger = configure_logger()
 
-__all__ = ["logger", "configure_logger", "get_logger"]
+__all__ = ["logger", "configure_logger", "get_logger", "set_log_level"]
@@ -1,9 +1,11 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, List
+from typing import Iterable, List, Optional, Set, Tuple
 
+from duksu.utils.url import normalize_url
 
-@dataclass
+
+@dataclass(slots=True)
 class NewsArticle:
     """Represents a single news article with full content extraction."""
     title: str
@@ -16,10 +18,28 @@ class NewsArticle:
     thumbnail_url: Optional[str] = None
     summary: Optional[str] = None
     summary_short: Optional[str] = None
-    keywords: Optional[List[str]] = None
+    keywords: Optional[Tuple[str, ...]] = None
     author: Optional[str] = None
 
 
+def drop_duplicate_articles(articles: Iterable[NewsArticle], seen_urls: Optional[Set[str]] = None) -> List[NewsArticle]:
+    """
+    Keep the first of the articles with the same normalized URL, so variants of an article's URL count as one article.
+    Articles whose normalized URL is in `seen_urls` are dropped too, the URLs of the articles kept are added to it.
+    """
+    if seen_urls is None:
+        seen_urls = set()
+
+    unique_articles: List[NewsArticle] = []
+    for article in articles:
+        url = normalize_url(article.url)
+        if url in seen_urls:
+            continue
+        seen_urls.add(url)
+        unique_articles.append(article)
+    return unique_articles
+
+
 class NewsSourceType(Enum):
     """Types of news sources."""
     RSS = "rss"
@@ -1,17 +1,24 @@
 import asyncio
-from typing import List, Optional
-from bs4 import BeautifulSoup
+import hashlib
+from typing import List, Optional, Tuple
+from cachetools import LRUCache
+from selectolax.parser import HTMLParser
 from newspaper import Article
 from langchain.schema.language_model import BaseLanguageModel
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 from duksu.news.model import NewsArticle
 from duksu.logging_config import create_logger
 from pydantic import BaseModel, Field
-from duksu.config import CONFIG
-from duksu.agent.prompts import AIPrompt, SystemPrompt, count_tokens
+from duksu.config import CONFIG, get_structured_output_model
+from duksu.agent.orchestrator import get_lm_orchestrator
+from duksu.agent.prompts import AIPrompt, SystemPrompt, truncate_tokens
+from duksu.utils.http import get_http_session
 import re
 
 
+# Whitespace around a line break, including any blank lines that follow it
+_LINE_BREAK_PADDING = re.compile(r'[^\S\n]*\n\s*')
+
+
 class ArticleContentNotAccessibleError(Exception):
     pass
 
@@ -27,10 +34,15 @@ class ArticleContentExtraction(BaseModel):
 
 class NewsArticleReader:
 
+    # Extractions of previously read article contents, shared across reader instances
+    _extraction_cache: LRUCache[str, ArticleContentExtraction] = LRUCache(maxsize=1024)
+
     def __init__(self, llm_model: BaseLanguageModel, system_prompt: Optional[SystemPrompt] = None):
-        self.article_content_extraction_model = llm_model.with_structured_output(ArticleContentExtraction)
+        self.article_content_extraction_model = get_structured_output_model(llm_model, ArticleContentExtraction)
         self.system_prompt = system_prompt or SystemPrompt()
         self.logger = create_logger("NewsArticleReader")
+        self.orchestrator = get_lm_orchestrator()
+        self.model_name = getattr(llm_model, "model_name", None) or getattr(llm_model, "model", None) or type(llm_model).__name__
     
     async def read_article(self, news_article: NewsArticle) -> NewsArticle:
         """
@@ -42,10 +54,13 @@ class NewsArticleReader:
         Returns:
             NewsArticle with filled summary, author, keywords, and thumbnail_url, etc
         """
+        if news_article.is_hydrated and news_article.summary:
+            return news_article
+
         article = Article(news_article.url)
         try:
-            article.download()
-            article.parse()
+            content, charset = await self._download_html(news_article.url)
+            await asyncio.to_thread(self._parse, article, content, charset)
         except Exception as e:
             raise ArticleContentNotAccessibleError(f"Article unable to download: {e}")
         
@@ -68,7 +83,7 @@ class NewsArticleReader:
         news_article.summary = article_content.summary
         news_article.summary_short = article_content.summary_short
         news_article.author = article_content.author if article_content.author and article_content.author != "None" else None
-        news_article.keywords = article_content.keywords[:CONFIG.ARTICLE_KEYWORDS_MAX_COUNT]
+        news_article.keywords = tuple(article_content.keywords[:CONFIG.ARTICLE_KEYWORDS_MAX_COUNT])
         news_article.thumbnail_url = article.top_image if article.top_image else None
 
         news_article.is_hydrated = True
@@ -77,65 +92,55 @@ class NewsArticleReader:
         
         return news_article
     
-    def split_html_by_tokens(self, html: str, max_tokens: int) -> List[str]:
-        """Split HTML content into chunks based on token count using LangChain's RecursiveCharacterTextSplitter."""
-        
-        # HTML-specific separators including tags and HTML-related symbols
-        html_separators = [
-            "</div>", "</section>", "</article>", "</main>", "</body>", "</html>",
-            "<div", "<section", "<article", "<main", "<body", "<html",
-            "</p>", "<p>", "</h1>", "</h2>", "</h3>", "</h4>", "</h5>", "</h6>",
-            "<h1", "<h2", "<h3", "<h4", "<h5", "<h6",
-            "</li>", "<li>", "</ul>", "<ul>", "</ol>", "<ol>",
-            "</td>", "<td", "</tr>", "<tr>", "</table>", "<table",
-            "</span>", "<span", "</a>", "<a ",
-            "\n\n", "\n", ". ", "! ", "? ", "; ", ": ", " ", ""
-        ]
-        
-        # Estimate chunk size based on average characters per token (approximately 4)
-        chunk_size = max_tokens * 4
-        chunk_overlap = min(200, chunk_size // 10)  # 10% overlap, max 200 chars
-        
-        text_splitter = RecursiveCharacterTextSplitter(
-            separators=html_separators,
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-            is_separator_regex=False,
-        )
-        
-        chunks = text_splitter.split_text(html)
-    
-        return chunks
-    
+    async def _download_html(self, url: str) -> Tuple[bytes, Optional[str]]:
+        # Read the raw body and decode it in the parsing thread rather than on the event loop
+        async with get_http_session().get(url) as response:
+            response.raise_for_status()
+            return await response.read(), response.charset
+
+    @staticmethod
+    def _parse(article: Article, content: bytes, charset: Optional[str]) -> None:
+        try:
+            html = content.decode(charset or "utf-8", errors="replace")
+        except LookupError:
+            html = content.decode("utf-8", errors="replace")
+        article.download(input_html=html)
+        article.parse()
+
     async def _extract_text_from_html(self, html: str) -> str:
-        """Extract article text from HTML by processing it in chunks using LLM."""
-        soup = BeautifulSoup(html, 'html.parser')
+        """
+        Extract the article's text from HTML, parsed with selectolax off the event loop: scripts and styles are dropped,
+        and blank lines and surrounding whitespace are collapsed. No LLM is involved, the text is truncated to the token
+        budget later, when the article content is extracted.
+        """
+        return await asyncio.to_thread(self._parse_text_from_html, html)
+
+    def _parse_text_from_html(self, html: str) -> str:
+        tree = HTMLParser(html)
         # kill all script and style elements
-        for script in soup(["script", "style"]):
-            script.extract()    # rip it out
+        for script in tree.css("script, style"):
+            script.decompose()    # rip it out
 
-        text = soup.get_text()
+        text = tree.root.text() if tree.root else ""
         
         # Clean up the text: remove empty lines and trim whitespace
-        lines = text.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            stripped_line = line.strip()
-            if stripped_line:
-                cleaned_lines.append(stripped_line)
-        
-        text = '\n'.join(cleaned_lines)
-        text_token_count = count_tokens(text)
-        self.logger.debug(f"Extracted {text_token_count} tokens of text from article HTML")
+        text = _LINE_BREAK_PADDING.sub('\n', text).strip()
+        self.logger.debug(f"Extracted {len(text)} characters of text from article HTML")
 
         return text
     
     async def _extract_article_content(self, title: str, text: str, source: str) -> ArticleContentExtraction:
-        content_tokens = count_tokens(text)
+        # Tokenize once to both check the minimum length and cap the content sent to the LLM
+        text, content_tokens = await asyncio.to_thread(truncate_tokens, text, CONFIG.ARTICLE_CONTENT_MAX_TOKENS)
         
         if content_tokens < 1000:
             raise ArticleContentNotAccessibleError(f"Article content is not sufficient: only {content_tokens} tokens (minimum 1000 required)")
+
+        cache_key = hashlib.sha256(f"{self.model_name}|{title}|{source}|{text}".encode()).hexdigest()
+        cached_response = self._extraction_cache.get(cache_key)
+        if cached_response is not None:
+            self.logger.debug(f"Reusing content extraction of article \"{title}\"")
+            return cached_response
         
         prompt = AIPrompt(self.system_prompt)
         prompt.add_task_prompt(f"""
@@ -160,7 +165,7 @@ News Article:
 """
         )
 
-        response = await self.article_content_extraction_model.ainvoke(prompt.get_prompt())
+        response = await self.orchestrator.call(self.article_content_extraction_model.ainvoke, prompt.get_prompt())
 
         if not isinstance(response, ArticleContentExtraction):
             self.logger.error(f"Unexpected response type while extracting article content; LLM response: {response}")
@@ -168,5 +173,6 @@ News Article:
                 is_content_sufficient=False,
                 is_content_sufficient_reasoning=f"Unexpected response type while extracting article content: {type(response)}"
             )
-        
+
+        self._extraction_cache[cache_key] = response
         return response
@@ -1,20 +1,26 @@
-from typing import List, Dict, Any, Optional, Type, Callable, cast, get_type_hints, Union
+from typing import List, Dict, Any, Optional, Tuple, Type, Callable, cast, get_type_hints, Union
 from dataclasses import dataclass
+from functools import cache, cached_property
 import asyncio
 import re
 import time
-from inspect import iscoroutinefunction, signature
+import orjson
+from inspect import Signature, iscoroutinefunction, signature
 from pathlib import Path
 
 from langchain_core.language_models import BaseLanguageModel
+from duksu.agent.orchestrator import get_lm_orchestrator
 from duksu.agent.prompts import AIPrompt, SystemPrompt
-from duksu.config import CONFIG
+from duksu.config import CONFIG, get_structured_output_model
 from duksu.news.model import NewsArticle
 from pydantic import BaseModel, Field
 from duksu.logging_config import create_logger
 from duksu.utils.time import parse_age_literal_to_seconds
 
 
+logger = create_logger("NewsSourceRegistry")
+
+
 @dataclass
 class NewsSource:
     """Information about a registered news source function."""
@@ -22,6 +28,7 @@ class NewsSource:
     source_name: str
     description: str
     param_model: Optional[Type[BaseModel]] = None
+    is_pydantic_param: bool = False  # Whether the function takes the validated param model itself rather than its fields
 
 
 class NewsSearchPlan(BaseModel):
@@ -30,27 +37,46 @@ class NewsSearchPlan(BaseModel):
     parameters: str = Field(default="{}", description="Parameters to pass to the news search function as JSON string")
     reasoning: str = Field(description="Why this source was selected and how parameters were determined")
 
+    @cached_property
+    def params(self) -> Dict[str, Any]:
+        """The parameters parsed from their JSON string, parsed once per plan as plans are reused from the plan caches."""
+        return orjson.loads(self.parameters)
+
 class NewsSearchPlanList(BaseModel):
     """List of execution plans for a news search."""
     search_plans: List[NewsSearchPlan] = Field(description="List of source and parameters for a news search")
 
 
+@cache
+def _get_max_article_age_seconds() -> Optional[int]:
+    """Get the configured article age cap in seconds, parsed once, or None if articles should not be filtered by age."""
+    age_cap = CONFIG.ARTICLE_COLLECTION_AGE_CAP
+    if not age_cap:
+        return None
+
+    try:
+        return parse_age_literal_to_seconds(age_cap)
+    except ValueError as e:
+        logger.error(f"Error parsing age cap '{age_cap}': {e}. Returning all articles.")
+        return None
+
+
 class NewsSourceRegistry:
     """Registry for managing news source functions."""
     
     _sources: Dict[str, NewsSource] = {}
-    logger = create_logger("NewsSourceRegistry")
+    _sources_version: int = 0  # Bumped on every registration, invalidating the cached description prompt
+    _cached_description_prompt: Optional[Tuple[int, str]] = None
+    logger = logger
     
     @classmethod
-    def _validate_source_function(cls, func: Callable, param_model: Optional[Type[BaseModel]] = None) -> None:
+    def _validate_source_function(cls, func: Callable, sig: Signature, param_model: Optional[Type[BaseModel]] = None) -> None:
         """Validate that the function can work with the given parameter model (Pydantic)."""
         try:
-            sig = signature(func)
             parameters = list(sig.parameters.values())
             
             if param_model is not None:
-                if not (hasattr(param_model, '__bases__') and 
-                       any(issubclass(base, BaseModel) for base in param_model.__mro__)):
+                if not (isinstance(param_model, type) and issubclass(param_model, BaseModel)):
                     raise ValueError(f"Parameter model {param_model.__name__} must be a Pydantic BaseModel")
                 
                 # Check if function expects parameters when param_model is provided
@@ -59,12 +85,11 @@ class NewsSourceRegistry:
                 
                 # Check if first parameter can accept the param_model
                 first_param = parameters[0]
-                if first_param.annotation != first_param.empty:
-                    if first_param.annotation != param_model:
-                        # Check if it's compatible (same base or inheritance)
-                        if not (hasattr(first_param.annotation, '__mro__') and 
-                               param_model in first_param.annotation.__mro__):
-                            cls.logger.warning(f"Function {func.__name__} parameter type {first_param.annotation} may not match param_model {param_model}")
+                annotation = first_param.annotation
+                if annotation is not first_param.empty:
+                    # Check if it's compatible (same model or inheritance)
+                    if not (isinstance(annotation, type) and issubclass(annotation, param_model)):
+                        cls.logger.warning(f"Function {func.__name__} parameter type {annotation} may not match param_model {param_model}")
             else:
                 # If no param_model, function should either have no params or have default values
                 required_params = [p for p in parameters if p.default == p.empty]
@@ -74,11 +99,24 @@ class NewsSourceRegistry:
         except Exception as e:
             cls.logger.warning(f"Could not validate function {func.__name__} with param_model: {e}")
 
+    @classmethod
+    def _is_pydantic_param(cls, sig: Signature) -> bool:
+        """Whether the first parameter of the function signature is annotated with a Pydantic model."""
+        parameters = list(sig.parameters.values())
+        if not parameters:
+            return False
+
+        annotation = parameters[0].annotation
+        return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
     @classmethod
     def _get_news_source_description_prompt(cls) -> str:
         """
         Get a description of all news sources for AI prompts.
         """
+        if cls._cached_description_prompt is not None and cls._cached_description_prompt[0] == cls._sources_version:
+            return cls._cached_description_prompt[1]
+
         sources = NewsSourceRegistry.get_all_sources()
         
         prompt_parts = [
@@ -130,30 +168,23 @@ class NewsSourceRegistry:
             "5. Override default parameters if needed to get more relevant results"
         ])
         
-        return "\n".join(prompt_parts)
+        description_prompt = "\n".join(prompt_parts)
+        cls._cached_description_prompt = (cls._sources_version, description_prompt)
+        return description_prompt
 
     @classmethod
     def _filter_articles_by_age(cls, articles: List[NewsArticle]) -> List[NewsArticle]:
         """Filter articles based on configured age cap."""
-        age_cap = CONFIG.ARTICLE_COLLECTION_AGE_CAP
-        if not age_cap:
+        max_age_seconds = _get_max_article_age_seconds()
+        if max_age_seconds is None:
             return articles
         
-        try:
-            max_age_seconds = parse_age_literal_to_seconds(age_cap)
-            current_timestamp = int(time.time())
-            cutoff_timestamp = current_timestamp - max_age_seconds
-            
-            filtered_articles = [
-                article for article in articles 
-                if article.published_at >= cutoff_timestamp
-            ]
-            
-            return filtered_articles
-            
-        except ValueError as e:
-            cls.logger.error(f"Error parsing age cap '{age_cap}': {e}. Returning all articles.")
-            return articles
+        cutoff_timestamp = int(time.time()) - max_age_seconds
+        
+        return [
+            article for article in articles 
+            if article.published_at >= cutoff_timestamp
+        ]
 
     @classmethod
     def register(cls, source_name: str, description: str, param_model: Optional[Type[BaseModel]] = None):
@@ -161,13 +192,15 @@ class NewsSourceRegistry:
         Decorator to register a news source function.
         """
         def decorator(func: Callable) -> Callable:
-            cls._validate_source_function(func, param_model)
+            # Introspect the function once at registration, rather than on every source dispatch
+            sig = signature(func)
+            cls._validate_source_function(func, sig, param_model)
             
             if not iscoroutinefunction(func):
                 async def async_wrapper(*args, **kwargs):
                     return await asyncio.to_thread(func, *args, **kwargs)
                 
-                async_wrapper.__signature__ = signature(func)
+                async_wrapper.__signature__ = sig
                 async_wrapper.__name__ = func.__name__
                 async_wrapper.__annotations__ = func.__annotations__
                 wrapped_func = async_wrapper
@@ -178,8 +211,10 @@ class NewsSourceRegistry:
                 source_function=wrapped_func,
                 source_name=source_name,
                 description=description,
-                param_model=param_model
+                param_model=param_model,
+                is_pydantic_param=cls._is_pydantic_param(sig)
             )
+            cls._sources_version += 1
             
             return func
         return decorator
@@ -201,18 +236,9 @@ class NewsSourceRegistry:
 
         try:
             if source.param_model:
-                validated_params = source.param_model(**params)
-                
-                sig = signature(source.source_function)
-                parameters = list(sig.parameters.values())
-                
-                first_param = parameters[0]
-                is_pydantic_param = (
-                    hasattr(first_param.annotation, '__bases__') and 
-                    any(issubclass(base, BaseModel) for base in first_param.annotation.__bases__)
-                ) if first_param.annotation != first_param.empty else False
+                validated_params = source.param_model.model_validate(params)
                 
-                if is_pydantic_param:
+                if source.is_pydantic_param:
                     articles = await source.source_function(validated_params)
                 else:
                     articles = await source.source_function(**validated_params.model_dump())
@@ -243,7 +269,7 @@ class NewsSourceRegistry:
 
     @classmethod
     async def get_news_search_plans(cls, llm: BaseLanguageModel, query_prompt: str, system_prompt: SystemPrompt = SystemPrompt()) -> NewsSearchPlanList:  
-        structured_llm = llm.with_structured_output(NewsSearchPlanList)
+        structured_llm = get_structured_output_model(llm, NewsSearchPlanList)
 
         prompt = AIPrompt(system_prompt)
         prompt.add_task_prompt(f"""
@@ -266,7 +292,7 @@ class NewsSourceRegistry:
 
         """)
         prompt.add_task_prompt(f"User Query: {query_prompt}")
-        response = cast(NewsSearchPlanList, await structured_llm.ainvoke(prompt.get_prompt()))
+        response = cast(NewsSearchPlanList, await get_lm_orchestrator().call(structured_llm.ainvoke, prompt.get_prompt()))
 
         if len(response.search_plans) > CONFIG.ARTICLE_REGISTRY_MAX_NEWS_SOURCES:
             cls.logger.warning(f"Number of news search plans ({len(response.search_plans)}) exceeds configured max number of news sources ({CONFIG.ARTICLE_REGISTRY_MAX_NEWS_SOURCES})")
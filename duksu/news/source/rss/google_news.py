@@ -1,13 +1,19 @@
-import feedparser
-import aiohttp
-from typing import List, Optional
-from urllib.parse import urlencode
+import asyncio
+import threading
+from functools import lru_cache
+from cachetools import LRUCache
+from io import BytesIO
+from lxml import etree
+from typing import List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
 from googlenewsdecoder import gnewsdecoder
+from duksu.config import CONFIG
 from duksu.news.model import NewsArticle
 from duksu.news.source.registry import news_source
 from duksu.logging_config import logger
 from pydantic import BaseModel, Field
 
+from duksu.utils.http import get_http_session
 from duksu.utils.time import convert_date_str_to_timestamp
 
 
@@ -36,21 +42,25 @@ GOOGLE_NEWS_TOPIC_IDS = {
 }
 
 
+@lru_cache(maxsize=1024)
+def _build_google_news_rss_url(path: str, language: str, country: str, search_keyword: Optional[str] = None) -> str:
+    params = {"q": search_keyword} if search_keyword is not None else {}
+    params.update({
+        "hl": f"{language}-{country}",
+        "gl": country,
+        "ceid": f"{country}:{language}"
+    })
+    return f"https://news.google.com/rss{path}?{urlencode(params)}"
+
+
 def get_google_news_rss_url(topic: str, param: GoogleNewsParam) -> str:
-    topic_lower = topic.lower()
+    topic_id = GOOGLE_NEWS_TOPIC_IDS.get(topic.lower())
     
-    if topic_lower not in GOOGLE_NEWS_TOPIC_IDS:
+    if topic_id is None:
         available_topics = list(GOOGLE_NEWS_TOPIC_IDS.keys())
         raise ValueError(f"Invalid topic '{topic}'. Available topics: {available_topics}")
     
-    base_url = "https://news.google.com/rss"
-    topic_id = GOOGLE_NEWS_TOPIC_IDS[topic_lower]
-    params = {
-        "hl": f"{param.language}-{param.country}",
-        "gl": param.country,
-        "ceid": f"{param.country}:{param.language}"
-    }
-    return f"{base_url}/topics/{topic_id}?{urlencode(params)}"
+    return _build_google_news_rss_url(f"/topics/{topic_id}", param.language, param.country)
 
 
 def clean_article_title(title: str) -> str:
@@ -58,11 +68,11 @@ def clean_article_title(title: str) -> str:
     if not title:
         return title
     
-    # Find the last occurrence of " - " and remove everything after it
+    # Split at the last occurrence of " - " and remove everything after it
     # This handles cases like "Title - Vendor Name" -> "Title"
-    last_dash_index = title.rfind(" - ")
-    if last_dash_index != -1:
-        cleaned_title = title[:last_dash_index].strip()
+    head, separator, _ = title.rpartition(" - ")
+    if separator:
+        cleaned_title = head.strip()
         # Only return the cleaned title if it's not empty
         if cleaned_title:
             return cleaned_title
@@ -70,12 +80,26 @@ def clean_article_title(title: str) -> str:
     return title
 
 
+# Decoded article URLs by the opaque article id of their Google News redirect URL, which is stable across polls
+_decoded_url_cache: LRUCache[str, str] = LRUCache(maxsize=8192)
+_decoded_url_cache_lock = threading.Lock()
+
+
 def decode_google_news_url(google_url: str) -> Optional[str]:
+    article_id = urlparse(google_url).path.rsplit("/", 1)[-1]
+    with _decoded_url_cache_lock:
+        decoded_url = _decoded_url_cache.get(article_id) if article_id else None
+    if decoded_url is not None:
+        return decoded_url
+
     try:
         result = gnewsdecoder(google_url, interval=1)
         
         if result.get("status"):
             decoded_url = result["decoded_url"]
+            if article_id:
+                with _decoded_url_cache_lock:
+                    _decoded_url_cache[article_id] = decoded_url
             return decoded_url
         else:
             logger.error(f"Failed to decode Google News URL: {google_url}, error: {result.get('message', 'Unknown error')}")
@@ -86,43 +110,59 @@ def decode_google_news_url(google_url: str) -> Optional[str]:
         return None
 
 
+def parse_rss_items(rss_content: bytes) -> List[Tuple[str, str, str, str]]:
+    """Parse the (title, link, source, published date) of each item in the RSS feed."""
+    items = []
+    for _, item in etree.iterparse(BytesIO(rss_content), tag="item", resolve_entities=False):
+        items.append((
+            item.findtext("title") or "Untitled",
+            item.findtext("link") or "",
+            item.findtext("source") or "",
+            item.findtext("pubDate") or "",
+        ))
+        item.clear()
+    return items
+
+
 async def fetch_google_news_rss(url: str) -> List[NewsArticle]:
-    """Helper function to fetch news from Google News RSS using feedparser and newspaper3k."""
+    """Helper function to fetch news from Google News RSS using lxml and newspaper3k."""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    logger.error(f"HTTP {response.status} when fetching {url}")
-                    return []
-                
-                rss_content = await response.text()
+        async with get_http_session().get(url) as response:
+            if response.status != 200:
+                logger.error(f"HTTP {response.status} when fetching {url}")
+                return []
+            
+            rss_content = await response.read()
         
-        feed = feedparser.parse(rss_content)
+        rss_items = await asyncio.to_thread(parse_rss_items, rss_content)
         
-        if not feed.entries:
+        if not rss_items:
             logger.warning(f"No entries found in RSS feed for {url}")
             return []
         
-        articles = []
-        for entry in feed.entries:
-            title = str(entry.get('title', 'Untitled'))
-            google_redirect_url = str(entry.get('link', ''))
-            source = getattr(entry.get('source', ''), 'title', str(entry.get('source', '')))
+        # Decode the redirect URLs concurrently, each decode being a blocking HTTP round trip
+        semaphore = asyncio.Semaphore(CONFIG.GOOGLE_NEWS_DECODE_CONCURRENCY)
 
-            published_at = convert_date_str_to_timestamp(str(entry.get('published', '')))
-            
-            article_url = decode_google_news_url(google_redirect_url)
-            if article_url is None:
-                logger.warning(f"Skipping entry '{title}' - failed to decode Google News URL")
-                continue
+        async def decode(google_redirect_url: str) -> Optional[str]:
+            async with semaphore:
+                return await asyncio.to_thread(decode_google_news_url, google_redirect_url)
 
-            article = NewsArticle(
+        article_urls = await asyncio.gather(*(decode(link) for _, link, _, _ in rss_items))
+
+        articles = [
+            NewsArticle(
                 title=clean_article_title(title),
                 url=article_url,
-                published_at=published_at,
+                published_at=convert_date_str_to_timestamp(published),
                 source=source,
             )
-            articles.append(article)
+            for (title, _, source, published), article_url in zip(rss_items, article_urls)
+            if article_url is not None
+        ]
+        
+        skipped_count = len(rss_items) - len(articles)
+        if skipped_count:
+            logger.warning(f"Skipped {skipped_count} entries from {url} - failed to decode Google News URL")
         
         logger.info(f"Successfully retrieved {len(articles)} articles from news source url: {url}")
         return articles
@@ -140,13 +180,7 @@ async def fetch_google_news_rss(url: str) -> List[NewsArticle]:
 async def google_news_top_stories(param: GoogleNewsParam = GoogleNewsParam()) -> List[NewsArticle]:
     """Get general top news from Google News RSS."""
     logger.info(f"Fetching Google News Top Stories from: {param}")
-    base_url = "https://news.google.com/rss"
-    params = {
-        "hl": f"{param.language}-{param.country}",
-        "gl": param.country,
-        "ceid": f"{param.country}:{param.language}"
-    }
-    url = f"{base_url}?{urlencode(params)}"
+    url = _build_google_news_rss_url("", param.language, param.country)
     return await fetch_google_news_rss(url)
 
 
@@ -234,12 +268,5 @@ async def google_news_health(param: GoogleNewsParam = GoogleNewsParam()) -> List
 )
 async def google_news_search(param: GoogleNewsSearchParam) -> List[NewsArticle]:
     """Get search-based news from Google News RSS using explicit parameter model."""
-    base_url = "https://news.google.com/rss"
-    params = {
-        "q": param.search_keyword,
-        "hl": f"{param.language}-{param.country}",
-        "gl": param.country,
-        "ceid": f"{param.country}:{param.language}"
-    }
-    url = f"{base_url}/search?{urlencode(params)}"
+    url = _build_google_news_rss_url("/search", param.language, param.country, param.search_keyword)
     return await fetch_google_news_rss(url)
@@ -0,0 +1,38 @@
+import asyncio
+from typing import Optional, Tuple
+
+import aiohttp
+
+
+# Browser-like user agent, as some news sites reject requests from default HTTP client user agents
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+_http_session: Optional[Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Get the HTTP session shared within the running event loop, so connections are pooled and kept alive across requests.
+    Must be called from a coroutine; close it with close_http_session() before the event loop ends.
+    """
+    global _http_session
+
+    loop = asyncio.get_running_loop()
+    if _http_session is None or _http_session[0] is not loop or _http_session[1].closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=15),
+            headers={"User-Agent": DEFAULT_USER_AGENT},
+        )
+        _http_session = (loop, session)
+
+    return _http_session[1]
+
+
+async def close_http_session() -> None:
+    """Close the shared HTTP session of the running event loop, if any."""
+    global _http_session
+
+    if _http_session is not None and _http_session[0] is asyncio.get_running_loop():
+        await _http_session[1].close()
+        _http_session = None
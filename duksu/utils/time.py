@@ -1,15 +1,19 @@
 from datetime import datetime
-from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from email.utils import mktime_tz, parsedate_tz
 import re
 import time
 
 from duksu.logging_config import logger
 
 
+_AGE_LITERAL_PATTERN = re.compile(r'^(\d+)(m|d|y)$')
+
+
+@lru_cache(maxsize=32)
 def parse_age_literal_to_seconds(age_literal: str) -> int:
     """Parse age cap string (e.g., '1d', '2m', '1y') to seconds."""
-    pattern = r'^(\d+)(m|d|y)$'
-    match = re.match(pattern, age_literal.lower())
+    match = _AGE_LITERAL_PATTERN.match(age_literal.lower())
     
     if not match:
         raise ValueError(f"Invalid age cap format: {age_literal}. Expected format: Nm, Nd, or Nyr (e.g., '1m', '30d', '1y')")
@@ -33,9 +37,11 @@ def convert_date_str_to_timestamp(date_str: str) -> int:
         return int(time.time())  # Current time as fallback
     
     try:
-        # Try parsing RFC 2822 format (common in RSS)
-        dt = parsedate_to_datetime(date_str)
-        return int(dt.timestamp())
+        # Try parsing RFC 2822 format (common in RSS) straight to a timestamp, without building a datetime
+        date_tuple = parsedate_tz(date_str)
+        if date_tuple is None:
+            raise ValueError(f"Not an RFC 2822 date: {date_str}")
+        return mktime_tz(date_tuple)
     except Exception:
         try:
             # Try ISO format
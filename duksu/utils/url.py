@@ -0,0 +1,23 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Query parameters only tracking where a visitor came from, they don't change the linked page
+_TRACKING_QUERY_PARAM_PREFIXES = ("utm_",)
+_TRACKING_QUERY_PARAMS = frozenset({"fbclid", "gclid", "ocid", "cmpid"})
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize an article URL for deduplication, so variants of the same page's URL compare equal.
+    The scheme and host are lowercased, and tracking query parameters, the fragment and trailing slashes are dropped.
+    """
+    parts = urlsplit(url.strip())
+
+    query = parts.query
+    if query:
+        query = urlencode([
+            (key, value) for key, value in parse_qsl(query, keep_blank_values=True)
+            if not (key.lower().startswith(_TRACKING_QUERY_PARAM_PREFIXES) or key.lower() in _TRACKING_QUERY_PARAMS)
+        ])
+
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
@@ -1,53 +1,108 @@
 import asyncio
-import json
+import logging
 import sys
 import argparse
-from typing import Any, List, Dict
+from typing import Any, Coroutine, List, Dict, Optional
 
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from duksu.logging_config import set_log_level
+from duksu.utils.http import close_http_session
 from duksu_exec.controller import run_workflow_with_history
-from .workflows.create_news_feed import execute_news_feed_workflow
-from .workflows.populate_feed import execute_populate_feed_workflow
-from .storage.db import get_db, get_db_session
+from .storage.db import get_db, get_db_session, run_db
 from .storage.model import User, NewsFeed
+from .config import CONFIG
+
+
+# Number of feeds fetched from the database per round trip by populate-all-feeds
+FEED_FETCH_BATCH_SIZE = 500
+
+
+def _get_feeds_page(after_feed_id: int, limit: int) -> List[Dict[str, Any]]:
+    """Get the next page of feeds by ID after the given one, with only the columns the workflows need."""
+    db = get_db()
+    feeds = db.execute(
+        select(NewsFeed.id, NewsFeed.query_prompt)
+        .where(NewsFeed.id > after_feed_id)
+        .order_by(NewsFeed.id)
+        .limit(limit)
+    )
+    return [{"feed_id": feed.id, "feed_query_prompt": feed.query_prompt} for feed in feeds]
 
 
 def setup_argparser():
-    """Set up command line argument parser."""
+    """Set up command line argument parser, each command carrying its workflow input data and workflow to run."""
     parser = argparse.ArgumentParser(description="Duksu CLI for news feed workflows")
+    parser.add_argument("--verbose", action="store_true", help="Log debug output, including the full workflow result")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
     
     add_user_parser = subparsers.add_parser("add-user", help="Add a new user")
     add_user_parser.add_argument("--user_id", help="User ID to add")
+    add_user_parser.set_defaults(
+        get_input_data=lambda args: {"user_id": args.user_id},
+        run_workflow=lambda args: add_user(args.user_id),
+    )
 
     create_news_feed_parser = subparsers.add_parser("create-news-feed", help="Create news feed workflow")
     create_news_feed_parser.add_argument("--user_id", help="User ID")
     create_news_feed_parser.add_argument("--query_prompt", help="Query prompt for news search")
+    create_news_feed_parser.set_defaults(
+        get_input_data=lambda args: {"user_id": args.user_id, "query_prompt": args.query_prompt},
+        run_workflow=lambda args: create_news_feed(args.user_id, args.query_prompt),
+    )
     
     populate_feed_parser = subparsers.add_parser("populate-feed", help="Populate existing feed with latest articles")
     populate_feed_parser.add_argument("--feed_id", type=int, help="Feed ID to populate")
+    populate_feed_parser.add_argument("--force", action="store_true", help="Populate the feed even if it was populated within the minimum populate interval")
+    populate_feed_parser.set_defaults(
+        get_input_data=lambda args: {"feed_id": args.feed_id, "force": args.force},
+        run_workflow=lambda args: populate_feed(args.feed_id, args.force),
+    )
     
     populate_all_feeds_parser = subparsers.add_parser("populate-all-feeds", help="Populate all feeds in the database with latest articles")
+    populate_all_feeds_parser.set_defaults(
+        get_input_data=lambda args: {},
+        run_workflow=lambda args: populate_all_feeds(),
+    )
     
     return parser
 
 
+# Workflow modules pull in the LLM and graph libraries, so they are imported only by the commands that run them
+async def create_news_feed(user_id: str, query_prompt: str) -> dict:
+    """Create a news feed for the user with the query prompt."""
+    from .workflows.create_news_feed import execute_news_feed_workflow
+
+    return await execute_news_feed_workflow(user_id, query_prompt)
+
+
+async def populate_feed(feed_id: int, force: bool = False) -> dict:
+    """Populate the feed with latest articles."""
+    from .workflows.populate_feed import execute_populate_feed_workflow
+
+    return await execute_populate_feed_workflow(feed_id, force=force)
+
+
 async def add_user(user_id: str) -> dict:
     """Add a new user to the database."""
     try:
-        # Check if user already exists
+        # Create new user, unless a user with the ID already exists
         db = get_db()
-        existing_user = db.query(User).filter(User.user_id == user_id).first()
-        if existing_user:
+        created_user_id = db.execute(
+            pg_insert(User).values(
+                user_id=user_id
+            ).on_conflict_do_nothing(
+                index_elements=[User.user_id]
+            ).returning(User.user_id)
+        ).scalar_one_or_none()
+        
+        if created_user_id is None:
             return {
                 "error_message": f"User with ID '{user_id}' already exists",
                 "user_id": user_id
             }
         
-        # Create new user
-        new_user = User(user_id=user_id)
-        db.add(new_user)
-        db.flush()
-        
         return {
             "user_id": user_id,
             "message": f"User '{user_id}' created successfully",
@@ -63,52 +118,73 @@ async def add_user(user_id: str) -> dict:
 
 async def populate_all_feeds() -> dict:
     """Populate all feeds in the database with latest articles."""
-    # Get all feeds from database
-    db = get_db()
-    all_feeds = db.query(NewsFeed).all()
+    from .workflows.populate_feed import execute_populate_feed_workflow
+
     response = {
         "total_feeds": 0,
         "successful_feeds": [],
         "failed_feeds": [],
         "error_message": None
     }
-        
-    if not all_feeds:
-        response["error_message"] = "No feeds found in database"
-        return response
-    
-    print(f"Found {len(all_feeds)} feeds to populate")
     
     successful_feeds: List[Dict[str, Any]] = []
     failed_feeds: List[Dict[str, Any]] = []
     
-    # Process each feed
-    for feed in all_feeds:
-        feed_id = feed.id
-        feed_info = {
-            "feed_id": feed_id,
-            "feed_query_prompt": feed.query_prompt,
-        }
+    # Feeds are streamed from the database into a bounded queue consumed by a fixed pool of workers,
+    # so neither the feeds nor the pending workflows are all held in memory at once
+    worker_count = CONFIG.MAX_FEED_CONCURRENCY
+    feed_queue: asyncio.Queue[Optional[Dict[str, Any]]] = asyncio.Queue(maxsize=worker_count * 2)
+    
+    async def produce_feeds() -> None:
+        # Feeds are fetched a page at a time by ID, each page in its own short transaction off the event loop,
+        # so no connection is held while the workers populate the feeds
+        last_feed_id = 0
+        while feeds := await run_db(_get_feeds_page, last_feed_id, FEED_FETCH_BATCH_SIZE):
+            for feed_info in feeds:
+                await feed_queue.put(feed_info)
+            last_feed_id = feeds[-1]["feed_id"]
         
-        try:
-            print(f"Populating feed ID {feed_id}")
-            
-            result = await execute_populate_feed_workflow(feed.id) # type: ignore
+        # Tell each worker there are no more feeds
+        for _ in range(worker_count):
+            await feed_queue.put(None)
+    
+    async def populate_feeds() -> None:
+        while (feed_info := await feed_queue.get()) is not None:
+            feed_id = feed_info["feed_id"]
             
-            if result.get("error_message") is None:
-                feed_info["result"] = result
-                successful_feeds.append(feed_info)
-                print(f"✅ Successfully populated feed ID {feed_id}")
-            else:
-                feed_info["error"] = result.get("error_message")
-                failed_feeds.append(feed_info)
-                print(f"❌ Failed to populate feed ID {feed_id}: {result.get('error_message')}")
+            try:
+                print(f"Populating feed ID {feed_id}")
+                # Each feed uses and commits its own session, sessions must not be shared by concurrent workflows
+                with get_db_session():
+                    result = await execute_populate_feed_workflow(feed_id, feed_info["feed_query_prompt"])
                 
-        except Exception as e:
-            feed_info["error"] = str(e)
-            failed_feeds.append(feed_info)
-            print(f"❌ Exception while populating feed ID {feed_id}: {str(e)}")
-            continue
+                if result.get("error_message") is None:
+                    # Keep only the counts, the full results would bloat the run history output
+                    feed_info["articles_retrieved"] = result["articles_retrieved"]
+                    feed_info["articles_curated"] = result["articles_curated"]
+                    successful_feeds.append(feed_info)
+                    print(f"✅ Successfully populated feed ID {feed_id}")
+                else:
+                    feed_info["error"] = result.get("error_message")
+                    failed_feeds.append(feed_info)
+                    print(f"❌ Failed to populate feed ID {feed_id}: {result.get('error_message')}")
+                    
+            except Exception as e:
+                feed_info["error"] = str(e)
+                failed_feeds.append(feed_info)
+                print(f"❌ Exception while populating feed ID {feed_id}: {str(e)}")
+    
+    # Populate the feeds concurrently, each workflow mostly waits on LLM and HTTP calls.
+    # Feed failures are recorded by the workers, anything else escaping a task (e.g. failing to read the feeds) cancels the others.
+    async with asyncio.TaskGroup() as task_group:
+        task_group.create_task(produce_feeds())
+        for _ in range(worker_count):
+            task_group.create_task(populate_feeds())
+    
+    total_feeds = len(successful_feeds) + len(failed_feeds)
+    if total_feeds == 0:
+        response["error_message"] = "No feeds found in database"
+        return response
     
     if successful_feeds:
         print(f"\n✅ Successful feeds:")
@@ -120,7 +196,7 @@ async def populate_all_feeds() -> dict:
         for feed in failed_feeds:
             print(f"  - Feed ID {feed['feed_id']} - Error: {feed['error']}")
     
-    response["total_feeds"] = len(all_feeds)
+    response["total_feeds"] = total_feeds
     response["successful_feeds"] = successful_feeds
     response["failed_feeds"] = failed_feeds
     response["error_message"] = None if len(failed_feeds) == 0 else f"{len(failed_feeds)} feeds failed to populate"
@@ -128,6 +204,17 @@ async def populate_all_feeds() -> dict:
     return response
 
 
+def run_until_complete(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run the command coroutine in a new event loop, closing the shared HTTP session before the loop ends."""
+    async def run():
+        try:
+            return await coro
+        finally:
+            await close_http_session()
+
+    return asyncio.run(run())
+
+
 def main():
     """Main CLI entry point."""
     parser = setup_argparser()
@@ -137,46 +224,14 @@ def main():
         parser.print_help()
         sys.exit(1)
     
-    if args.command == "create-news-feed":
-        input_data = {"user_id": args.user_id, "query_prompt": args.query_prompt}
-            
-        asyncio.run(run_workflow_with_history(
-            command_name="create-news-feed",
-            input_data=input_data,
-            workflow_func=lambda: execute_news_feed_workflow(args.user_id, args.query_prompt),
-        ))
-    
-    elif args.command == "populate-feed":
-        input_data = {"feed_id": args.feed_id}
-        
-        asyncio.run(run_workflow_with_history(
-            command_name="populate-feed",
-            input_data=input_data,
-            workflow_func=lambda: execute_populate_feed_workflow(args.feed_id),
-        ))
-    
-    elif args.command == "populate-all-feeds":
-        input_data = {}
-        
-        asyncio.run(run_workflow_with_history(
-            command_name="populate-all-feeds",
-            input_data=input_data,
-            workflow_func=lambda: populate_all_feeds(),
-        ))
-    
-    elif args.command == "add-user":
-        print(args)
-        input_data = {"user_id": args.user_id}
-        
-        asyncio.run(run_workflow_with_history(
-            command_name="add-user",
-            input_data=input_data,
-            workflow_func=lambda: add_user(args.user_id),
-        ))
+    if args.verbose:
+        set_log_level(logging.DEBUG)
     
-    else:
-        parser.print_help()
-        sys.exit(1)
+    run_until_complete(run_workflow_with_history(
+        command_name=args.command,
+        input_data=args.get_input_data(args),
+        workflow_func=lambda: args.run_workflow(args),
+    ))
 
 
 if __name__ == "__main__":
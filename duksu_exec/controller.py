@@ -1,54 +1,78 @@
-import json
-from datetime import datetime
+import asyncio
+import logging
+import orjson
 from typing import Any, Callable
 
+from sqlalchemy import bindparam, func, insert, update
 from sqlalchemy.orm import Session
 from duksu.logging_config import logger
-from duksu_exec.storage.db import get_db_session
+from duksu_exec.storage.db import get_db_session, run_db
 from duksu_exec.storage.enums import WorkflowRunStatus
 from duksu_exec.storage.model import WorkflowRunHistory
 
 
+# Workflow results may carry integer keyed dicts, and values orjson can't serialize natively fall back to str
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+# Built once so that every run hits SQLAlchemy's compiled statement cache without rebuilding the statements
+_INSERT_RUN = insert(WorkflowRunHistory).returning(WorkflowRunHistory.id)
+
+# Over the table, as an ORM bulk UPDATE by primary key can't take the server-side completion time
+_FINALIZE_RUN = update(WorkflowRunHistory.__table__).where(
+    WorkflowRunHistory.__table__.c.id == bindparam("run_id")
+).values(
+    status=bindparam("status"),
+    output_data=bindparam("output_data"),
+    completed_at=func.now()
+)
+
+
+def _insert_run(session: Session, command_name: str, input_data: dict) -> int:
+    return session.execute(
+        _INSERT_RUN,
+        {
+            "workflow_name": command_name,
+            "input_data": input_data,
+            "status": WorkflowRunStatus.STARTED,
+        }
+    ).scalar_one()
+
+
+def _finalize_run(session: Session, run_id: int, run_status: WorkflowRunStatus, output_data: dict) -> None:
+    session.execute(_FINALIZE_RUN, {"run_id": run_id, "status": run_status, "output_data": output_data})
+
+
 async def run_workflow_with_history(command_name: str, input_data: dict, workflow_func: Callable[[], Any]):
+    """
+    Run the workflow, recording its run history.
+    The run is recorded in short transactions of its own before and after the workflow,
+    so the run shows as started while it is in progress and no connection is held for the history meanwhile.
+    """
     run_id = None
     try:
         with get_db_session() as session:
-            workflow_run = WorkflowRunHistory(
-                workflow_name=command_name,
-                input_data=json.dumps(input_data),
-                status=WorkflowRunStatus.STARTED
-            )
-            session.add(workflow_run)
-            session.flush()  # Get the ID
-            run_id = workflow_run.id
-
-            logger.info(f"Started workflow run ID: {run_id}")
-    
+            run_id = await run_db(_insert_run, session, command_name, input_data)
+
+        logger.info(f"Started workflow run ID: {run_id}")
+
+        with get_db_session():
             result = await workflow_func()
-            run_status = WorkflowRunStatus.COMPLETED if result.get("error_message") is None else WorkflowRunStatus.FAILED
+        run_status = WorkflowRunStatus.COMPLETED if result.get("error_message") is None else WorkflowRunStatus.FAILED
 
-            workflow_run = session.query(WorkflowRunHistory).filter(
-                WorkflowRunHistory.id == run_id
-            ).first()
-            if workflow_run:
-                workflow_run.status = run_status # type: ignore
-                workflow_run.output_data = json.dumps(result, default=str) # type: ignore
-                workflow_run.completed_at = datetime.now() # type: ignore
+        with get_db_session() as session:
+            await run_db(_finalize_run, session, run_id, run_status, result)
 
-            logger.info("Workflow result:")
-            logger.info(json.dumps(result, indent=2, default=str))
-            logger.info(f"Workflow completed with status: {run_status.value}")
+        # Only build the indented dump when it is going to be emitted, off the event loop as results can be large
+        if logger.isEnabledFor(logging.DEBUG):
+            result_dump = await asyncio.to_thread(orjson.dumps, result, default=str, option=_ORJSON_OPTIONS | orjson.OPT_INDENT_2)
+            logger.debug(f"Workflow result:\n{result_dump.decode()}")
+        logger.info(f"Workflow completed with status: {run_status.value}")
 
-            return result
+        return result
 
     except Exception as e:
         logger.error(f"❌ Unhandled error: {e}")
         if run_id is not None:
             with get_db_session() as session:
-                workflow_run = session.query(WorkflowRunHistory).filter(
-                    WorkflowRunHistory.id == run_id
-                ).first()
-                if workflow_run:
-                    workflow_run.status = WorkflowRunStatus.ERROR # type: ignore
-                    workflow_run.output_data = json.dumps({"error_message": str(e)}, default=str) # type: ignore
-                    workflow_run.completed_at = datetime.now() # type: ignore
\ No newline at end of file
+                await run_db(_finalize_run, session, run_id, WorkflowRunStatus.ERROR, {"error_message": str(e)})
@@ -1,38 +1,69 @@
-from datetime import datetime
-import json
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+import asyncio
+from datetime import datetime, timedelta, timezone
+import orjson
+import threading
+from cachetools import TTLCache
+from sqlalchemy import Float, bindparam, create_engine, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import load_only, sessionmaker, Session
 from contextlib import contextmanager
-from typing import Any, Generator, Dict, Optional
+from contextvars import ContextVar, Token
+from pydantic import TypeAdapter
+from typing import Any, Callable, Generator, Dict, List, Optional, Set, Tuple, TypeVar
 
 from duksu.news.model import NewsArticle
+from duksu.news.source.registry import NewsSearchPlan
 from duksu_exec.storage.objectstore import ObjectStore
-from .model import NewsArticle as DBNewsArticle, NewsFeed
+from .model import NewsArticle as DBNewsArticle, NewsFeed, NewsFeedItem, NewsSearchPlanCache
 from ..config import CONFIG
 from .model import Base
 
 
+# Workflow results may carry integer keyed dicts, and values orjson can't serialize natively fall back to str
+def _serialize_json(value: Any) -> str:
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 # Create engine
 def create_db_engine():
     """Create database engine based on configuration."""
     database_url = CONFIG.DATABASE_URL
     
-    engine = create_engine(database_url, echo=False)
+    # Pool connections for concurrent workflows, checking them on checkout and recycling them before server-side timeouts
+    engine = create_engine(
+        database_url,
+        echo=False,
+        pool_size=CONFIG.DATABASE_POOL_SIZE,
+        max_overflow=CONFIG.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        json_serializer=_serialize_json,
+        json_deserializer=orjson.loads,
+    )
     
     return engine
 
 
 engine = create_db_engine()
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Sessions by name, scoped to the current context so that concurrent workflows each use their own session.
+# Tasks and threads started from a context (asyncio tasks, asyncio.to_thread) inherit its sessions.
+_session_registry: ContextVar[Dict[str, Session]] = ContextVar("db_session_registry", default={})
+
+# Validates and serializes the cached news search plans JSON in one pass with the compiled core schema
+_news_search_plans_adapter = TypeAdapter(List[NewsSearchPlan])
+
 
-_session_registry: Dict[str, Session] = {}
+def _register_session(session_name: str, session: Session) -> Token[Dict[str, Session]]:
+    return _session_registry.set({**_session_registry.get(), session_name: session})
 
 
 @contextmanager
 def get_db_session(session_name: str = "default") -> Generator[Session, None, None]:
-    """Get database session with automatic cleanup."""
+    """Get database session with automatic cleanup, used by `get_db` within the current context."""
     session = SessionLocal()
-    _session_registry[session_name] = session
+    token = _register_session(session_name, session)
     try:
         yield session
         session.commit()
@@ -41,87 +72,310 @@ def get_db_session(session_name: str = "default") -> Generator[Session, None, No
         raise
     finally:
         session.close()
+        _session_registry.reset(token)
 
 
 def get_db(session_name: str = "default") -> Session:
-    """Get singleton database session by name."""
-    if session_name in _session_registry:
-        session = _session_registry[session_name]
-        if session.is_active:
-            return session
-        else:
-            _session_registry.pop(session_name, None)
+    """Get database session by name for the current context."""
+    session = _session_registry.get().get(session_name)
+    if session is not None and session.is_active:
+        return session
     
     session = SessionLocal()
-    _session_registry[session_name] = session
+    _register_session(session_name, session)
     return session
 
 
+T = TypeVar("T")
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run synchronous database work on the default executor so it does not block the event loop.
+    The session must only be used by one caller at a time, so await the result before touching it again.
+
+    The work is committed as its own transaction, together with changes pending in the session, so the session's
+    connection goes back to the pool instead of being held across the LLM and HTTP calls awaited between database work.
+    The session is the one registered under the `session_name` passed to the work, if any, or the default one.
+    Without a session registered in the current context, the work runs in a new session closed once done.
+    """
+    session_name = kwargs.get("session_name") or "default"
+
+    def run_in_transaction() -> T:
+        session = _session_registry.get().get(session_name)
+        if session is None or not session.is_active:
+            with get_db_session(session_name):
+                return fn(*args, **kwargs)
+
+        try:
+            result = fn(*args, **kwargs)
+            session.commit()
+            return result
+        except Exception:
+            session.rollback()
+            raise
+
+    return await asyncio.to_thread(run_in_transaction)
+
+
+async def run_db_in_new_session(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run synchronous database work like `run_db`, but in a new session of its own, committed and closed once done.
+    Used by work running concurrently within a workflow (e.g. parallel graph branches), which must not share a session.
+    """
+    def run_in_session() -> T:
+        # The thread runs in a copy of the caller's context, so the session is only registered for this work
+        with get_db_session():
+            return fn(*args, **kwargs)
+
+    return await asyncio.to_thread(run_in_session)
+
+
 # ===============================
 # Storage Helper Functions
 # ===============================
 
+# Stored articles by URL, as feeds populated in the same run often come across the same articles
+_news_article_cache: TTLCache[str, NewsArticle] = TTLCache(maxsize=10_000, ttl=300)
+_news_article_cache_lock = threading.Lock()
+
+# Built once so that every lookup hits SQLAlchemy's compiled statement cache without rebuilding the statement
+_SELECT_NEWS_ARTICLES = select(DBNewsArticle).options(
+    load_only(
+        DBNewsArticle.title,
+        DBNewsArticle.url,
+        DBNewsArticle.thumbnail_url,
+        DBNewsArticle.published_at,
+        DBNewsArticle.source,
+        DBNewsArticle.summary,
+        DBNewsArticle.summary_short,
+        DBNewsArticle.keywords,
+        DBNewsArticle.author,
+    )
+)
+_SELECT_NEWS_ARTICLE_BY_URL = _SELECT_NEWS_ARTICLES.where(DBNewsArticle.url == bindparam("url"))
+_SELECT_NEWS_ARTICLES_BY_URLS = _SELECT_NEWS_ARTICLES.where(DBNewsArticle.url.in_(bindparam("urls", expanding=True)))
+
+
+def _to_news_article(db_article: DBNewsArticle) -> NewsArticle:
+    keywords = getattr(db_article, 'keywords', None)
+    return NewsArticle(
+        title=getattr(db_article, 'title', ''),
+        url=getattr(db_article, 'url', ''),
+        thumbnail_url=getattr(db_article, 'thumbnail_url', None),
+        published_at=getattr(db_article, 'published_at', 0),
+        source=getattr(db_article, 'source', ''),
+        summary=getattr(db_article, 'summary', None),
+        summary_short=getattr(db_article, 'summary_short', None),
+        keywords=tuple(keywords) if keywords else None,
+        author=getattr(db_article, 'author', None)
+    )
+
+
 class Storage:
 
     @classmethod
-    async def store_news_article(cls, article: NewsArticle, session_name: Optional[str] = None) -> DBNewsArticle:
-        """Store a news article in the database."""
-        db = get_db(session_name) if session_name else get_db()
+    async def _save_news_article_content(cls, object_store: ObjectStore, article: NewsArticle) -> Tuple[Optional[str], Optional[str]]:
+        """Save the HTML and markdown content of the article, returning their paths."""
+        async def no_content() -> None:
+            return None
+
+        # Save the HTML and markdown content concurrently, they are independent writes
+        html_path, markdown_path = await asyncio.gather(
+            object_store.save_html(article.raw_html, filename=article.title, metadata={"article_url": article.url})
+            if article.raw_html else no_content(),
+            object_store.save_markdown(article.content, filename=article.title, metadata={"article_url": article.url})
+            if article.content else no_content(),
+        )
+        return html_path, markdown_path
+
+    @classmethod
+    async def store_news_articles(cls, articles: List[NewsArticle], session_name: Optional[str] = None) -> List[int]:
+        """
+        Store news articles in the database with a single INSERT, returning the IDs of the articles inserted.
+        Articles already stored (by URL) are skipped.
+        """
+        if not articles:
+            return []
+
         object_store = ObjectStore(prefix=datetime.now().strftime("%Y-%m-%d"))
 
-        html_path = None
-        markdown_path = None
-
-        if article.raw_html:
-            html_path = await object_store.save_html(article.raw_html, filename=article.title, metadata={"article_url": article.url})
-        if article.content:
-            markdown_path = await object_store.save_markdown(article.content, filename=article.title, metadata={"article_url": article.url})
-
-        # Create new article record
-        db_article = DBNewsArticle(
-            title=article.title,
-            url=article.url,
-            published_at=article.published_at,
-            source=article.source,
-            raw_html_path=html_path,
-            content_markdown_path=markdown_path,
-            thumbnail_url=article.thumbnail_url,
-            summary=article.summary,
-            summary_short=article.summary_short,
-            keywords=json.dumps(article.keywords) if article.keywords else None,
-            author=article.author
+        # Save the content of a batch concurrently, bounded so a large batch doesn't exhaust the thread and connection pools
+        semaphore = asyncio.Semaphore(CONFIG.MAX_OBJECT_STORE_CONCURRENCY)
+
+        async def save_content(article: NewsArticle) -> Tuple[Optional[str], Optional[str]]:
+            async with semaphore:
+                return await cls._save_news_article_content(object_store, article)
+
+        content_paths = await asyncio.gather(*(save_content(article) for article in articles))
+
+        # Create new article records, off the event loop
+        article_ids = await run_db(
+            cls._insert_news_articles,
+            [
+                {
+                    "title": article.title,
+                    "url": article.url,
+                    "published_at": article.published_at,
+                    "source": article.source,
+                    "raw_html_path": html_path,
+                    "content_markdown_path": markdown_path,
+                    "thumbnail_url": article.thumbnail_url,
+                    "summary": article.summary,
+                    "summary_short": article.summary_short,
+                    "keywords": list(article.keywords) if article.keywords else None,
+                    "author": article.author,
+                }
+                for article, (html_path, markdown_path) in zip(articles, content_paths)
+            ],
+            session_name=session_name
         )
-        db.add(db_article)
-        db.flush()
 
-        return db_article
+        with _news_article_cache_lock:
+            for article in articles:
+                _news_article_cache.pop(article.url, None)
+
+        return article_ids
+
+    @classmethod
+    def _insert_news_articles(cls, article_rows: List[Dict[str, Any]], session_name: Optional[str] = None) -> List[int]:
+        """Insert the article rows with a single INSERT, skipping articles already stored, returning the IDs inserted."""
+        db = get_db(session_name) if session_name else get_db()
+        return list(db.scalars(
+            pg_insert(DBNewsArticle).on_conflict_do_nothing(
+                index_elements=[DBNewsArticle.url]
+            ).returning(DBNewsArticle.id),
+            article_rows
+        ).all())
+
+    @classmethod
+    async def store_news_article(cls, article: NewsArticle, session_name: Optional[str] = None) -> Optional[int]:
+        """Store a news article in the database, returning its ID or None if the article was already stored."""
+        article_ids = await cls.store_news_articles([article], session_name=session_name)
+        return article_ids[0] if article_ids else None
 
     @classmethod
     def get_news_article_by_url(cls, url: str, session_name: Optional[str] = None) -> NewsArticle | None:
+        with _news_article_cache_lock:
+            cached_article = _news_article_cache.get(url)
+        if cached_article is not None:
+            return cached_article
+
         db = get_db(session_name) if session_name else get_db()
-        db_article = db.query(DBNewsArticle).filter(
-            DBNewsArticle.url == url
-        ).first()
+        db_article = db.scalar(_SELECT_NEWS_ARTICLE_BY_URL, {"url": url})
 
         if not db_article:
             return None
 
-        keywords_json = getattr(db_article, 'keywords', None)
-        return NewsArticle(
-            title=getattr(db_article, 'title', ''),
-            url=getattr(db_article, 'url', ''),
-            thumbnail_url=getattr(db_article, 'thumbnail_url', None),
-            published_at=getattr(db_article, 'published_at', 0),
-            source=getattr(db_article, 'source', ''),
-            summary=getattr(db_article, 'summary', None),
-            summary_short=getattr(db_article, 'summary_short', None),
-            keywords=json.loads(keywords_json) if keywords_json else None,
-            author=getattr(db_article, 'author', None)
+        news_article = _to_news_article(db_article)
+
+        with _news_article_cache_lock:
+            _news_article_cache[url] = news_article
+        return news_article
+
+    @classmethod
+    def get_news_articles_by_urls(cls, urls: List[str], session_name: Optional[str] = None) -> Dict[str, NewsArticle]:
+        """
+        Get the stored articles among the URLs, by URL, looking up the ones not cached with a single query.
+        The lookup is synchronous, async callers run it through `run_db`.
+        """
+        news_articles: Dict[str, NewsArticle] = {}
+        with _news_article_cache_lock:
+            for url in urls:
+                cached_article = _news_article_cache.get(url)
+                if cached_article is not None:
+                    news_articles[url] = cached_article
+
+        uncached_urls = [url for url in urls if url not in news_articles]
+        if not uncached_urls:
+            return news_articles
+
+        db = get_db(session_name) if session_name else get_db()
+        fetched_articles = [_to_news_article(db_article) for db_article in db.scalars(_SELECT_NEWS_ARTICLES_BY_URLS, {"urls": uncached_urls})]
+
+        with _news_article_cache_lock:
+            for news_article in fetched_articles:
+                _news_article_cache[news_article.url] = news_article
+                news_articles[news_article.url] = news_article
+        return news_articles
+
+    @classmethod
+    def get_news_feed_query_prompt(cls, feed_id: int, session_name: Optional[str] = None) -> Optional[str]:
+        """Get the query prompt of the feed, or None if the feed doesn't exist, without loading the rest of the row."""
+        db = get_db(session_name) if session_name else get_db()
+        return db.scalar(select(NewsFeed.query_prompt).where(NewsFeed.id == feed_id))
+
+    @classmethod
+    def get_news_feed_last_populated_at(cls, feed_id: int, session_name: Optional[str] = None) -> Optional[datetime]:
+        """Get when articles were last linked to the feed, or None if the feed has no articles."""
+        db = get_db(session_name) if session_name else get_db()
+        return db.scalar(select(func.max(NewsFeedItem.created_at)).where(NewsFeedItem.news_feed_id == feed_id))
+
+    @classmethod
+    def get_news_feed_article_urls(cls, feed_id: int, urls: List[str], session_name: Optional[str] = None) -> Set[str]:
+        """Get the URLs among the given ones of articles already linked to the feed."""
+        db = get_db(session_name) if session_name else get_db()
+        return set(db.scalars(
+            select(DBNewsArticle.url)
+            .join(NewsFeedItem, NewsFeedItem.news_article_id == DBNewsArticle.id)
+            .where(
+                NewsFeedItem.news_feed_id == feed_id,
+                DBNewsArticle.url.in_(urls)
+            )
+        ))
+
+    @classmethod
+    def link_news_articles_to_feed(cls, feed_id: int, urls: List[str], session_name: Optional[str] = None) -> None:
+        """Link the stored articles with the URLs to the feed with a single INSERT ... SELECT, skipping articles already linked."""
+        db = get_db(session_name) if session_name else get_db()
+        db.execute(
+            pg_insert(NewsFeedItem).from_select(
+                [NewsFeedItem.news_feed_id, NewsFeedItem.news_article_id],
+                select(literal(feed_id), DBNewsArticle.id).where(
+                    DBNewsArticle.url.in_(urls)
+                )
+            ).on_conflict_do_nothing(
+                index_elements=[NewsFeedItem.news_feed_id, NewsFeedItem.news_article_id]
+            )
         )
 
     @classmethod
     async def store_curation_result(cls, content: Dict[str, Any]) -> None:
         object_store = ObjectStore(prefix=datetime.now().strftime("%Y-%m-%d"))
-        stored_filename = f"curation-{object_store.generate_unique_filename(json.dumps(content), "json")}"
+        stored_filename = f"curation-{object_store.generate_unique_filename(orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS), 'json')}"
         
-        await object_store.save_json(content, filename=stored_filename)
\ No newline at end of file
+        await object_store.save_json(content, filename=stored_filename)
+
+    @staticmethod
+    def _news_search_plan_cache_cutoff() -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=CONFIG.NEWS_SEARCH_PLAN_CACHE_TTL_SECONDS)
+
+    @classmethod
+    def get_cached_news_search_plans(cls, query_embedding: List[float], min_similarity: float, session_name: Optional[str] = None) -> Optional[List[NewsSearchPlan]]:
+        """Get the unexpired news search plans cached for the query prompt nearest to the given embedding, if similar enough."""
+        db = get_db(session_name) if session_name else get_db()
+        cosine_distance = NewsSearchPlanCache.query_embedding.op("<=>", return_type=Float)(query_embedding)
+        cached = db.execute(
+            select(
+                NewsSearchPlanCache.search_plans,
+                cosine_distance.label("distance")
+            ).where(
+                NewsSearchPlanCache.created_at >= cls._news_search_plan_cache_cutoff()
+            ).order_by(cosine_distance).limit(1)
+        ).first()
+
+        if not cached or 1 - cached.distance < min_similarity:
+            return None
+
+        return _news_search_plans_adapter.validate_json(cached.search_plans)
+
+    @classmethod
+    def store_news_search_plans(cls, query_prompt: str, query_embedding: List[float], search_plans: List[NewsSearchPlan], session_name: Optional[str] = None) -> None:
+        db = get_db(session_name) if session_name else get_db()
+        db.execute(delete(NewsSearchPlanCache).where(NewsSearchPlanCache.created_at < cls._news_search_plan_cache_cutoff()))
+        db.add(NewsSearchPlanCache(
+            query_prompt=query_prompt,
+            query_embedding=query_embedding,
+            search_plans=_news_search_plans_adapter.dump_json(search_plans).decode()
+        ))
+        db.flush()
\ No newline at end of file
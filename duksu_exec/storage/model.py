@@ -1,14 +1,40 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, Boolean, Float, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.types import UserDefinedType
 import uuid
 from .enums import WorkflowRunStatus
 
 Base = declarative_base()
 
 
+class Vector(UserDefinedType):
+    """pgvector column type, exchanged with Python as a list of floats."""
+    cache_ok = True
+
+    def __init__(self, dimensions: int):
+        self.dimensions = dimensions
+
+    def get_col_spec(self, **kw):
+        return f"VECTOR({self.dimensions})"
+
+    def bind_processor(self, dialect):
+        def process(value):
+            if value is None:
+                return None
+            return "[" + ",".join(str(float(x)) for x in value) + "]"
+        return process
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None:
+                return None
+            return [float(x) for x in value.strip("[]").split(",")]
+        return process
+
+
 class User(Base):
     """Model for storing users."""
     __tablename__ = "users"
@@ -28,9 +54,9 @@ class WorkflowRunHistory(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     workflow_name = Column(String(255), nullable=False, index=True)
-    input_data = Column(Text, nullable=False)  # JSON string of input parameters
-    output_data = Column(Text, nullable=True)  # JSON string of output/result
-    status = Column(SQLEnum(WorkflowRunStatus), nullable=False)
+    input_data = Column(JSONB, nullable=False)  # Input parameters
+    output_data = Column(JSONB, nullable=True)  # Output/result
+    status = Column(SQLEnum(WorkflowRunStatus), nullable=False, index=True)
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
@@ -49,6 +75,11 @@ class NewsFeed(Base):
     user = relationship("User", back_populates="news_feeds")
     feed_items = relationship("NewsFeedItem", back_populates="news_feed", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # One feed per user and query prompt, hashed as prompts can exceed the btree row size limit
+        Index("uq_news_feeds_user_id_query_prompt", user_id, func.md5(query_prompt), unique=True),
+    )
+
 
 class NewsFeedItem(Base):
     """Model for storing news feed items with curation scores."""
@@ -64,6 +95,11 @@ class NewsFeedItem(Base):
     news_feed = relationship("NewsFeed", back_populates="feed_items")
     news_article = relationship("NewsArticle", back_populates="feed_items")
 
+    __table_args__ = (
+        # An article is linked to a feed at most once, also serving the lookup of articles already in a feed
+        Index("uq_news_feed_items_news_feed_id_news_article_id", news_feed_id, news_article_id, unique=True),
+    )
+
 
 class NewsArticle(Base):
     """Model for storing news articles."""
@@ -79,10 +115,25 @@ class NewsArticle(Base):
     thumbnail_url = Column(Text, nullable=True)
     summary = Column(Text, nullable=True)
     summary_short = Column(Text, nullable=True)
-    keywords = Column(Text, nullable=True)  # JSON string of keywords list
+    keywords = Column(JSONB, nullable=True)  # List of keywords
     author = Column(String(255), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationship to feed items
     feed_items = relationship("NewsFeedItem", back_populates="news_article")
+
+
+# Fixed by the migration creating the news_search_plan_cache table
+QUERY_EMBEDDING_DIMENSIONS = 768
+
+
+class NewsSearchPlanCache(Base):
+    """Model for caching news search plans by query prompt embedding."""
+    __tablename__ = "news_search_plan_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    query_prompt = Column(Text, nullable=False)
+    query_embedding = Column(Vector(QUERY_EMBEDDING_DIMENSIONS), nullable=False)
+    search_plans = Column(Text, nullable=False)  # JSON string of news search plans
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,21 +1,55 @@
-import json
+import io
 import os
-import hashlib
 import asyncio
 import boto3
+import orjson
+import xxhash
+import zstandard
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
+from cachetools import LRUCache
+from functools import cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 from abc import ABC, abstractmethod
 from pathvalidate import sanitize_filename
 from ..config import CONFIG
 
 
+# Spaces and characters that are problematic for S3 keys are replaced with underscores
+_FILENAME_TRANSLATION = str.maketrans({char: '_' for char in ' %#?&=+@:,$[]{}|\\^~`<>"\''})
+
+# Compressed content is saved under its path with the suffix appended, content too small to benefit is saved as is
+_COMPRESSED_SUFFIX = ".zst"
+_MIN_COMPRESSED_CONTENT_LENGTH = 4 * 1024
+
+
+def _compress(*chunks: bytes) -> bytes:
+    """Compress the chunks into a single zstd frame, without concatenating them first."""
+    compressor = zstandard.ZstdCompressor(level=3).compressobj(size=sum(map(len, chunks)))
+    return b"".join([*(compressor.compress(chunk) for chunk in chunks), compressor.flush()])
+
+
+def _decode(content: bytes, path: str) -> str:
+    if path.endswith(_COMPRESSED_SUFFIX):
+        content = zstandard.ZstdDecompressor().decompress(content)
+    return content.decode('utf-8')
+
+
 class ObjectStoreBackend(ABC):
     """Abstract base class for object store backends."""
     
-    @abstractmethod
     async def save_content(self, content: str, path: str, metadata: dict) -> str:
         """Save content and return the storage path/URL."""
+        return await self.save_content_bytes(content.encode('utf-8'), path, metadata)
+    
+    @abstractmethod
+    async def save_content_bytes(self, content: bytes, path: str, metadata: dict, skip_if_exists: bool = False) -> str:
+        """
+        Save UTF-8 encoded content and return the storage path/URL.
+        Content is compressed when the path ends with the compressed suffix.
+        With skip_if_exists, for content-addressed paths, content already saved at the path isn't saved again.
+        """
         pass
     
     @abstractmethod
@@ -27,37 +61,43 @@ class ObjectStoreBackend(ABC):
 class LocalFileSystemBackend(ObjectStoreBackend):
     """Local filesystem backend for object storage."""
     
+    _HTML_METADATA_HEADER = b"<!-- \nArticle URL: %s\nSaved at: %s\n-->\n"
+    _MARKDOWN_METADATA_HEADER = b"---\narticle_url: %s\nsaved_at: %s\n---\n\n"
+    
     def __init__(self, base_path: str):
         self.base_path = Path(base_path)
         self.html_path = self.base_path / "html"
         self.markdown_path = self.base_path / "markdown"
     
-    async def save_content(self, content: str, path: str, metadata: dict) -> str:
+    @staticmethod
+    def _write_file(file_path: Path, metadata_header: bytes, content: bytes, skip_if_exists: bool) -> None:
+        if skip_if_exists and file_path.exists():
+            return
+        
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with open(file_path, 'wb') as f:
+            if file_path.name.endswith(_COMPRESSED_SUFFIX):
+                f.write(_compress(metadata_header, content))
+            else:
+                # Write the header and content separately rather than concatenating a copy of the content
+                f.write(metadata_header)
+                f.write(content)
+    
+    @staticmethod
+    def _read_file(file_path: Path) -> str:
+        return _decode(file_path.read_bytes(), file_path.name)
+    
+    async def save_content_bytes(self, content: bytes, path: str, metadata: dict, skip_if_exists: bool = False) -> str:
         """Save content to local file system."""
         file_path = self.base_path / path
-        file_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Add metadata to content based on file type
-        if path.endswith('.html'):
-            content_with_metadata = f"""<!-- 
-Article URL: {metadata.get('article_url', '')}
-Saved at: {file_path}
--->
-{content}"""
-        else:  # markdown
-            content_with_metadata = f"""---
-article_url: {metadata.get('article_url', '')}
-saved_at: {file_path}
----
-
-{content}"""
+        header_template = self._HTML_METADATA_HEADER if path.removesuffix(_COMPRESSED_SUFFIX).endswith('.html') else self._MARKDOWN_METADATA_HEADER
+        metadata_header = header_template % (metadata.get('article_url', '').encode('utf-8'), str(file_path).encode('utf-8'))
         
         # Save asynchronously
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None, 
-            lambda: file_path.write_text(content_with_metadata, encoding='utf-8')
-        )
+        await asyncio.to_thread(self._write_file, file_path, metadata_header, content, skip_if_exists)
         
         return str(file_path.relative_to(self.base_path.parent))
     
@@ -65,30 +105,46 @@ saved_at: {file_path}
         """Read content from local file system."""
         try:
             full_path = self.base_path.parent / path
-            loop = asyncio.get_event_loop()
-            content = await loop.run_in_executor(
-                None, 
-                lambda: full_path.read_text(encoding='utf-8')
-            )
+            content = await asyncio.to_thread(self._read_file, full_path)
             return content
         except (FileNotFoundError, IOError):
             return None
 
 
+# Creating a session loads botocore's configs and endpoint data, so one thread-safe client is shared by all S3 backends
+@cache
+def _get_s3_client():
+    session = boto3.Session(
+        aws_access_key_id=CONFIG.S3_ACCESS_KEY_ID,
+        aws_secret_access_key=CONFIG.S3_SECRET_ACCESS_KEY,
+        region_name=CONFIG.S3_REGION
+    )
+    
+    # Size the connection pool for the concurrent article saves, botocore defaults to 10 connections
+    return session.client(
+        's3',
+        endpoint_url=CONFIG.S3_ENDPOINT_URL,
+        config=BotoConfig(max_pool_connections=CONFIG.S3_MAX_POOL_CONNECTIONS)
+    )
+
+
+# Content-addressed keys known to be stored, by bucket and key, to skip even the HEAD request for repeated content
+_stored_s3_keys: LRUCache = LRUCache(maxsize=10_000)
+
+
 class S3Backend(ObjectStoreBackend):
     """S3 backend for object storage."""
     
+    _HTML_METADATA_HEADER = b"<!-- \nArticle URL: %s\nS3 Key: %s\n-->\n"
+    _MARKDOWN_METADATA_HEADER = b"---\narticle_url: %s\ns3_key: %s\n---\n\n"
+    
     def __init__(self, base_path: str):
-        # Initialize S3 client
-        session = boto3.Session(
-            aws_access_key_id=CONFIG.S3_ACCESS_KEY_ID,
-            aws_secret_access_key=CONFIG.S3_SECRET_ACCESS_KEY,
-            region_name=CONFIG.S3_REGION
-        )
+        self.s3_client = _get_s3_client()
         
-        self.s3_client = session.client(
-            's3',
-            endpoint_url=CONFIG.S3_ENDPOINT_URL
+        self.multipart_transfer_config = TransferConfig(
+            multipart_threshold=CONFIG.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=CONFIG.S3_MULTIPART_CHUNK_SIZE,
+            max_concurrency=10
         )
         
         self.bucket_name = CONFIG.S3_BUCKET_NAME
@@ -97,47 +153,77 @@ class S3Backend(ObjectStoreBackend):
         if not self.bucket_name:
             raise ValueError("S3_BUCKET_NAME must be configured for S3 backend")
     
+    def _get_object_content(self, s3_key: str) -> str:
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+        return _decode(response['Body'].read(), s3_key)
+    
+    def _put_object_content(self, s3_key: str, metadata_header: bytes, content: bytes, extra_args: Dict[str, Any]) -> None:
+        if s3_key.endswith(_COMPRESSED_SUFFIX):
+            body = _compress(metadata_header, content)
+            extra_args = {**extra_args, 'ContentEncoding': 'zstd'}
+        else:
+            body = b"".join((metadata_header, content))
+        
+        # Large content is uploaded in parts uploaded concurrently
+        if len(body) >= CONFIG.S3_MULTIPART_THRESHOLD:
+            self.s3_client.upload_fileobj(
+                io.BytesIO(body),
+                self.bucket_name,
+                s3_key,
+                ExtraArgs=extra_args,
+                Config=self.multipart_transfer_config
+            )
+        else:
+            self.s3_client.put_object(Bucket=self.bucket_name, Key=s3_key, Body=body, **extra_args)
+    
+    def _object_exists(self, s3_key: str) -> bool:
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
+            return True
+        except self.s3_client.exceptions.ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+    
     def _get_s3_key(self, path: str) -> str:
         """Generate S3 key with prefix."""
         return f"{self.path_prefix}/{path}" if self.path_prefix else path
     
-    async def save_content(self, content: str, path: str, metadata: dict) -> str:
+    async def save_content_bytes(self, content: bytes, path: str, metadata: dict, skip_if_exists: bool = False) -> str:
         """Save content to S3."""
         s3_key = self._get_s3_key(path)
         
+        # A HEAD request is much cheaper than uploading the content again
+        if skip_if_exists:
+            if (self.bucket_name, s3_key) in _stored_s3_keys or await asyncio.to_thread(self._object_exists, s3_key):
+                _stored_s3_keys[(self.bucket_name, s3_key)] = True
+                return s3_key
+        
         # Add metadata to content based on file type
-        if path.endswith('.html'):
-            content_with_metadata = f"""<!-- 
-Article URL: {metadata.get('article_url', '')}
-S3 Key: {s3_key}
--->
-{content}"""
+        if path.removesuffix(_COMPRESSED_SUFFIX).endswith('.html'):
+            header_template = self._HTML_METADATA_HEADER
             content_type = 'text/html'
         else:  # markdown
-            content_with_metadata = f"""---
-article_url: {metadata.get('article_url', '')}
-s3_key: {s3_key}
----
-
-{content}"""
+            header_template = self._MARKDOWN_METADATA_HEADER
             content_type = 'text/markdown'
         
-        # Upload to S3 asynchronously
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(
-            None,
-            lambda: self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=content_with_metadata.encode('utf-8'),
-                ContentType=content_type,
-                Metadata={
-                    'article_url': metadata.get('article_url', ''),
-                    'content_type': content_type
-                }
-            )
+        metadata_header = header_template % (metadata.get('article_url', '').encode('utf-8'), s3_key.encode('utf-8'))
+        object_metadata = {
+            'article_url': metadata.get('article_url', ''),
+            'content_type': content_type
+        }
+        
+        # Upload to S3 asynchronously, compressing in the worker thread too
+        await asyncio.to_thread(
+            self._put_object_content,
+            s3_key,
+            metadata_header,
+            content,
+            {'ContentType': content_type, 'Metadata': object_metadata}
         )
         
+        if skip_if_exists:
+            _stored_s3_keys[(self.bucket_name, s3_key)] = True
         return s3_key
     
     async def read_content(self, path: str) -> Optional[str]:
@@ -145,13 +231,8 @@ s3_key: {s3_key}
         try:
             s3_key = self._get_s3_key(path) if not path.startswith(self.path_prefix) else path
             
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
-            )
-            
-            content = response['Body'].read().decode('utf-8')
+            # Read the body in the worker thread too, it is streamed from the network
+            content = await asyncio.to_thread(self._get_object_content, s3_key)
             return content
         except self.s3_client.exceptions.ClientError as e:
             if e.response['Error']['Code'] == 'NoSuchKey':
@@ -168,6 +249,10 @@ class ObjectStore:
     
     def __init__(self, prefix: str = ""):
         self.backend = self._create_backend(prefix)
+        
+        self.compression = CONFIG.OBJECT_STORE_COMPRESSION.lower()
+        if self.compression not in ('none', 'zstd'):
+            raise ValueError(f"Unsupported object store compression: {self.compression}")
     
     def _create_backend(self, prefix: str = "") -> ObjectStoreBackend:
         """Create the appropriate backend based on configuration."""
@@ -184,25 +269,26 @@ class ObjectStore:
         else:
             raise ValueError(f"Unsupported object store type: {store_type}")
     
+    async def _save_content(self, content: bytes, path: str, metadata: Dict[str, Any], skip_if_exists: bool) -> str:
+        if self.compression == 'zstd' and len(content) >= _MIN_COMPRESSED_CONTENT_LENGTH:
+            path += _COMPRESSED_SUFFIX
+        
+        return await self.backend.save_content_bytes(content, path, metadata, skip_if_exists=skip_if_exists)
+    
     def sanitize_filename(self, filename: str) -> str:
         """Sanitize filename to be safe for file systems and S3 keys."""
         sanitized = sanitize_filename(filename, replacement_text="_")
-        sanitized = sanitized.replace(' ', '_')
-        
-        sanitized = ''.join(char for char in sanitized if ord(char) < 128)
-        
-        # Remove characters that are problematic for S3 keys
-        problematic_chars = '%#?&=+@:,$[]{}|\\^~`<>"\''
-        for char in problematic_chars:
-            sanitized = sanitized.replace(char, '_')
         
-        if len(sanitized) > 200:
-            sanitized = sanitized[:200]
-        return sanitized.strip('_')
+        # Drop non-ASCII characters, then replace the rest in a single pass
+        sanitized = sanitized.encode('ascii', 'ignore').decode('ascii').translate(_FILENAME_TRANSLATION)
+        return sanitized[:200].strip('_')
 
-    def generate_unique_filename(self, content: str, extension: str) -> str:
+    def generate_unique_filename(self, content: Union[str, bytes], extension: str) -> str:
         """Generate a unique filename based on content hash."""
-        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        # The hash only names content for dedup, so a fast non-cryptographic 128-bit hash is enough
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        content_hash = xxhash.xxh3_128_hexdigest(content)
         return f"{content_hash}.{extension}"
     
     async def save_html(self, content: str, filename: Optional[str] = None, metadata: Dict[str, Any] = {}) -> str:
@@ -220,18 +306,24 @@ class ObjectStore:
         if not content:
             return ""
         
+        # Encode once, the same bytes are hashed for the filename and saved
+        body = content.encode('utf-8')
+        
+        # Generated filenames are content hashes, so content already saved under one needn't be saved again
+        content_addressed = not filename
         if filename:
             sanitized_filename = self.sanitize_filename(filename)
             filename = f"{sanitized_filename}.html"
         else:
-            filename = self.generate_unique_filename(content, "html")
+            filename = self.generate_unique_filename(body, "html")
         
         path = f"html/{filename}"
         
-        return await self.backend.save_content(
-            content, 
+        return await self._save_content(
+            body, 
             path, 
-            metadata
+            metadata,
+            skip_if_exists=content_addressed
         )
     
     async def save_markdown(self, content: str, filename: Optional[str] = None, metadata: Dict[str, Any] = {}) -> str:
@@ -249,36 +341,48 @@ class ObjectStore:
         if not content:
             return ""
         
+        # Encode once, the same bytes are hashed for the filename and saved
+        body = content.encode('utf-8')
+        
+        # Generated filenames are content hashes, so content already saved under one needn't be saved again
+        content_addressed = not filename
         if filename:
             sanitized_filename = self.sanitize_filename(filename)
             filename = f"{sanitized_filename}.md"
         else:
-            filename = self.generate_unique_filename(content, "md")
+            filename = self.generate_unique_filename(body, "md")
         
         path = f"markdown/{filename}"
         
-        return await self.backend.save_content(
-            content, 
+        return await self._save_content(
+            body, 
             path, 
-            metadata
+            metadata,
+            skip_if_exists=content_addressed
         )
 
     async def save_json(self, content: Dict[str, Any], filename: Optional[str] = None, metadata: Dict[str, Any] = {}) -> str:
         if not content:
             return ""
         
+        # Serialize once, the same bytes are hashed for the filename and saved
+        serialized = orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        
+        # Generated filenames are content hashes, so content already saved under one needn't be saved again
+        content_addressed = not filename
         if filename:
             sanitized_filename = self.sanitize_filename(filename)
             filename = f"{sanitized_filename}.json"
         else:
-            filename = self.generate_unique_filename(json.dumps(content), "json")
+            filename = self.generate_unique_filename(serialized, "json")
         
         path = f"json/{filename}"
         
-        return await self.backend.save_content(
-            json.dumps(content),
+        return await self._save_content(
+            serialized,
             path,
-            metadata
+            metadata,
+            skip_if_exists=content_addressed
         )
 
 # Global instance
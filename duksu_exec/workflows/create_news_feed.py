@@ -1,9 +1,12 @@
 import json
+from functools import cache
 from langgraph.graph import StateGraph, END
 from .state import CreateNewsFeedState
 from .nodes.news_feed_manager import create_feed_node
 
 
+# The graph is static, compile it once per process and share it across runs
+@cache
 def create_news_feed_workflow():
     workflow = StateGraph(CreateNewsFeedState)
     
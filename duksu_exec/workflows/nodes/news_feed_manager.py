@@ -1,16 +1,36 @@
-import json
-from typing import Any, Callable, Coroutine, List
+import asyncio
+from typing import Any, Callable, Coroutine, Dict, List, Optional
 
+from cachetools import TTLCache
 from langchain_core.rate_limiters import InMemoryRateLimiter
-from duksu.config import get_llm
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from duksu.config import get_embedding_model, get_llm
 from duksu.feed import FeedCurator
 from duksu.news.source import NewsSourceRegistry
+from duksu.news.source.registry import NewsSearchPlan
+from duksu.news.model import NewsArticle
 from duksu.news.reader import ArticleContentNotAccessibleError, NewsArticleReader
 from duksu.logging_config import logger
 
 from ..state import CreateNewsFeedState, PopulateFeedState
-from ...storage.db import Storage, get_db
-from ...storage.model import NewsFeed, NewsArticle as DBNewsArticle, NewsFeedItem
+from ...config import CONFIG
+from ...storage.db import Storage, get_db, run_db, run_db_in_new_session
+from ...storage.model import QUERY_EMBEDDING_DIMENSIONS, NewsFeed
+
+
+def _create_feed(user_id: str, query_prompt: str) -> Optional[int]:
+    """Create the news feed row, returning its ID or None if the user already has a feed for the query prompt."""
+    db = get_db()
+
+    return db.execute(
+        pg_insert(NewsFeed).values(
+            user_id=user_id,
+            query_prompt=query_prompt,
+        ).on_conflict_do_nothing(
+            index_elements=[NewsFeed.user_id, func.md5(NewsFeed.query_prompt)]
+        ).returning(NewsFeed.id)
+    ).scalar_one_or_none()
 
 
 async def create_feed_node(state: CreateNewsFeedState):
@@ -19,50 +39,114 @@ async def create_feed_node(state: CreateNewsFeedState):
     This creates an empty feed that can later be populated with articles.
     """
     try:
-        db = get_db()
-
-        # Check if feed with same user_id and query prompt already exists
-        existing_feed = db.query(NewsFeed).filter(
-            NewsFeed.user_id == state["user_id"],
-            NewsFeed.query_prompt == state["query_prompt"]
-        ).first()
-        if existing_feed:
+        feed_id = await run_db(_create_feed, state["user_id"], state["query_prompt"])
+        if feed_id is None:
             state["error_message"] = "A feed with given user id and query prompt already exists"
             return state
 
-        # Create the news feed
-        news_feed = NewsFeed(
-            user_id=state["user_id"],
-            query_prompt=state["query_prompt"],
-        )
-        db.add(news_feed)
-        db.flush()  # Get the ID
-
-        return { "feed_id": news_feed.id }
+        return { "feed_id": feed_id }
             
     except Exception as e:
         state["error_message"] = str(e)
         raise e
 
 
-async def create_news_search_plans_node(state: PopulateFeedState):
+async def _embed_query_prompt(query_prompt: str) -> Optional[List[float]]:
     try:
-        llm = get_llm()
+        query_embedding = await get_embedding_model().aembed_query(query_prompt)
+    except Exception as e:
+        logger.warning(f"Failed to embed query prompt, skipping news search plan cache: {e}")
+        return None
+
+    # Embeddings of another size can't be stored in or compared against the cache's embedding column
+    if len(query_embedding) != QUERY_EMBEDDING_DIMENSIONS:
+        logger.warning(f"Query prompt embedding has {len(query_embedding)} dimensions instead of {QUERY_EMBEDDING_DIMENSIONS}, skipping news search plan cache")
+        return None
+
+    return query_embedding
+
+
+async def _plan_news_searches(query_prompt: str) -> List[NewsSearchPlan]:
+    # Planning is shared by the workflows with the same query prompt and may outlive the one that started it,
+    # so its database work uses sessions of its own rather than that workflow's
+
+    # Reuse the search plans of a semantically similar query prompt to skip the LLM planner
+    query_embedding = await _embed_query_prompt(query_prompt)
+    search_plans = await run_db_in_new_session(
+        Storage.get_cached_news_search_plans,
+        query_embedding,
+        min_similarity=CONFIG.NEWS_SEARCH_PLAN_CACHE_MIN_SIMILARITY
+    ) if query_embedding else None
+
+    if search_plans:
+        logger.info(f"Reusing cached news search plans for query prompt \"{query_prompt[:100]}\"")
+        return search_plans
+
+    llm = get_llm()
+
+    news_search_plans = await NewsSourceRegistry.get_news_search_plans(llm, query_prompt)
+    if len(news_search_plans.search_plans) == 0:
+        raise ValueError("No news search plans found")
 
-        news_search_plans = await NewsSourceRegistry.get_news_search_plans(llm, state["feed_query_prompt"])
-        if len(news_search_plans.search_plans) == 0:
-            raise ValueError("No news search plans found")
+    search_plans = news_search_plans.search_plans
+    if query_embedding:
+        await run_db_in_new_session(Storage.store_news_search_plans, query_prompt, query_embedding, search_plans)
 
-        for plan in news_search_plans.search_plans:
+    return search_plans
+
+
+# Recently planned query prompts, and plannings in progress shared by concurrent workflows with the same query prompt
+_news_search_plans_cache: TTLCache[str, List[NewsSearchPlan]] = TTLCache(maxsize=512, ttl=600)
+_news_search_plans_inflight: Dict[str, asyncio.Task[List[NewsSearchPlan]]] = {}
+
+
+async def _get_news_search_plans(query_prompt: str) -> List[NewsSearchPlan]:
+    search_plans = _news_search_plans_cache.get(query_prompt)
+    if search_plans is not None:
+        return search_plans
+
+    # No await between the lookup and the insert, so only one task is ever started per query prompt
+    task = _news_search_plans_inflight.get(query_prompt)
+    if task is None:
+        task = asyncio.create_task(_plan_news_searches(query_prompt))
+        _news_search_plans_inflight[query_prompt] = task
+        task.add_done_callback(lambda _: _news_search_plans_inflight.pop(query_prompt, None))
+    else:
+        logger.info(f"Waiting for in-progress news search planning of query prompt \"{query_prompt[:100]}\"")
+
+    search_plans = await asyncio.shield(task)
+    _news_search_plans_cache[query_prompt] = search_plans
+    return search_plans
+
+
+async def create_news_search_plans_node(state: PopulateFeedState):
+    try:
+        search_plans = await _get_news_search_plans(state["feed_query_prompt"])
+
+        for plan in search_plans:
             logger.debug(f"News Source: {plan.source_name}, Parameters: {plan.parameters}, Reasoning: {plan.reasoning}")
 
-        return {"news_search_plans": news_search_plans.search_plans }
+        return {"news_search_plans": search_plans }
         
     except Exception as e:
         state["error_message"] = str(e)
         raise e
 
 
+# Caps the retrievals fanned out by all workflows of the process, bound to the event loop it was created in
+_retrieve_semaphore: Optional[asyncio.Semaphore] = None
+_retrieve_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_retrieve_semaphore() -> asyncio.Semaphore:
+    global _retrieve_semaphore, _retrieve_semaphore_loop
+    loop = asyncio.get_running_loop()
+    if _retrieve_semaphore is None or _retrieve_semaphore_loop is not loop:
+        _retrieve_semaphore = asyncio.Semaphore(CONFIG.MAX_PARALLEL_RETRIEVALS)
+        _retrieve_semaphore_loop = loop
+    return _retrieve_semaphore
+
+
 async def retrieve_articles_node(state: Any):
     try:
         if "news_search_plan" not in state:
@@ -70,12 +154,13 @@ async def retrieve_articles_node(state: Any):
 
         news_search_plan = state["news_search_plan"]
 
-        logger.info(f"Retrieving articles from {news_search_plan.source_name} with parameters {news_search_plan.parameters}")
-        
-        raw_articles = await NewsSourceRegistry.retrieve_news_articles_from_source(
-            source_name=news_search_plan.source_name,
-            params=json.loads(news_search_plan.parameters)
-        )
+        async with _get_retrieve_semaphore():
+            logger.info(f"Retrieving articles from {news_search_plan.source_name} with parameters {news_search_plan.parameters}")
+            
+            raw_articles = await NewsSourceRegistry.retrieve_news_articles_from_source(
+                source_name=news_search_plan.source_name,
+                params=news_search_plan.params
+            )
         if not raw_articles:
             state["error_message"] = f"No articles found from {news_search_plan.source_name} with parameters {news_search_plan.parameters}"
             return
@@ -88,6 +173,32 @@ async def retrieve_articles_node(state: Any):
         raise e
 
 
+def retrieve_and_curate_articles_node(min_relevance_score: float, max_articles_per_batch: int) -> Any:
+    """
+    Retrieve the articles of a news search plan and curate them right away, so the curation of the articles
+    retrieved by a plan overlaps with the retrievals of the other plans rather than waiting for all of them.
+    """
+    async def retrieve_and_curate_articles_node_func(state: Any):
+        retrieved = await retrieve_articles_node(state)
+        if not retrieved:
+            return {}
+
+        # The curator scores each article once, duplicates across search plans are dropped by the state reducer
+        curated_articles = await _curate_articles(state["feed_id"], state["feed_query_prompt"], retrieved["articles_retrieved"], min_relevance_score, max_articles_per_batch)
+
+        return {"articles_retrieved": retrieved["articles_retrieved"], "articles_title_curated": curated_articles}
+
+    return retrieve_and_curate_articles_node_func
+
+
+def reduce_title_curated_articles_node(state: PopulateFeedState):
+    """
+    Collect the articles curated by title across all search plans, the same article retrieved by several plans
+    was already dropped by the state reducer.
+    """
+    return {"articles_curated": state["articles_title_curated"]}
+
+
 async def read_and_store_articles_node(state: PopulateFeedState) -> PopulateFeedState:
     """
     Read articles through url to get the full article content, and store them in the database.
@@ -97,29 +208,71 @@ async def read_and_store_articles_node(state: PopulateFeedState) -> PopulateFeed
 
     raw_articles = state["articles_curated"]
     
-    articles = []
+    # Look up the articles already in DB all at once
+    stored_articles = await run_db(Storage.get_news_articles_by_urls, [article.url for article in raw_articles])
     
-    for i, article in enumerate(raw_articles, 1):
-        logger.debug(f"({i}/{len(raw_articles)}) AI is reading article \"{article.title}\" - {article.url}")
-
-        # check if article is already in DB
-        stored_article = Storage.get_news_article_by_url(article.url)
+    # Read the articles not in DB concurrently, the rate limiter paces the LLM calls
+    semaphore = asyncio.Semaphore(CONFIG.MAX_ARTICLE_READ_CONCURRENCY)
+    
+    async def read_article(i: int, article: NewsArticle) -> Optional[NewsArticle]:
+        stored_article = stored_articles.get(article.url)
         if stored_article:
             logger.debug(f"Article {article.title} - {article.url} already exists in DB, skipping...")
-            articles.append(stored_article)
-        else:
-            # if article is not in DB, read it and store it
+            return stored_article
+        
+        async with semaphore:
+            logger.debug(f"({i}/{len(raw_articles)}) AI is reading article \"{article.title}\" - {article.url}")
             try:
-                hydrated_article = await article_reader.read_article(article)
-                await Storage.store_news_article(hydrated_article)
-
-                articles.append(hydrated_article)
+                return await article_reader.read_article(article)
             except ArticleContentNotAccessibleError as e:
                 logger.debug(f"Skipping article as content is not accessible: {e}")
-                continue
+                return None
+    
+    read_articles = await asyncio.gather(*(read_article(i, article) for i, article in enumerate(raw_articles, 1)))
+    
+    articles = [article for article in read_articles if article is not None]
+    
+    # Store the newly read articles all at once
+    await Storage.store_news_articles([article for article in articles if article.url not in stored_articles])
     
     return {"articles_curated": articles} # type: ignore
 
+async def _curate_articles(feed_id: int, feed_query_prompt: str, articles: List[NewsArticle], min_relevance_score: float, max_articles_per_batch: int) -> List[NewsArticle]:
+    """Curate the articles for the feed, storing the curation result, and return the articles selected."""
+    # Omit articles that are already linked to the feed, looked up for all articles in one query.
+    # Search plan branches curate concurrently, so each looks up in its own session rather than the workflow's
+    linked_urls = await run_db_in_new_session(Storage.get_news_feed_article_urls, feed_id, [article.url for article in articles])
+    articles_to_curate = [article for article in articles if article.url not in linked_urls]
+
+    # Curate articles using FeedCurator
+    curator = FeedCurator(llm=get_llm())
+    news_curation_result = await curator.curate_news_feed(
+        query_prompt=feed_query_prompt,
+        articles=articles_to_curate,
+        max_articles_per_batch=max_articles_per_batch,
+        min_relevance_score=min_relevance_score
+    )
+
+    await Storage.store_curation_result(content={
+        "query_prompt": feed_query_prompt,
+        "articles": [
+            {
+                "title": x.item.title,
+                "url": x.item.url,
+                "summary": x.item.summary,
+                "scores": x.scores
+            } for x in news_curation_result.items
+        ],
+        "unscored_article_count": news_curation_result.unscored_article_count
+    })
+
+    if news_curation_result.is_partial:
+        logger.warning(f"Partially curated {len(news_curation_result.items)} articles for feed {feed_id}, {news_curation_result.unscored_article_count} articles could not be scored")
+    else:
+        logger.info(f"Successfully curated {len(news_curation_result.items)} articles for feed {feed_id} with query prompt {feed_query_prompt}")
+    return [x.item for x in news_curation_result.items]
+
+
 def curate_articles_node(min_relevance_score: float, max_articles_per_batch: int) -> Any:
     """
     Curate the articles and store them in the database.
@@ -129,48 +282,8 @@ def curate_articles_node(min_relevance_score: float, max_articles_per_batch: int
             if not state["articles_curated"]:
                 raise ValueError("No articles to curate")
 
-            db = get_db()
-            feed = db.query(NewsFeed).filter(NewsFeed.id == state["feed_id"]).first()
-            if not feed:
-                raise ValueError(f"Feed with ID {state['feed_id']} not found")
-
-            # Omit articles that are already linked to the feed
-            articles_to_curate = []
-            for article in state["articles_curated"]:
-                existing_article = db.query(DBNewsArticle).filter(DBNewsArticle.url == article.url).first()
-                if existing_article:
-                    existing_feed_item = db.query(NewsFeedItem).filter(
-                            NewsFeedItem.news_feed_id == state["feed_id"],
-                            NewsFeedItem.news_article_id == existing_article.id
-                        ).first()
-                    if existing_feed_item:
-                        continue
-                    
-                articles_to_curate.append(article)
-
-            # Curate articles using FeedCurator
-            curator = FeedCurator(llm=get_llm())
-            news_curation_result = await curator.curate_news_feed(
-                query_prompt=str(feed.query_prompt),
-                articles=articles_to_curate,
-                max_articles_per_batch=max_articles_per_batch,
-                min_relevance_score=min_relevance_score
-            )
-
-            await Storage.store_curation_result(content={
-                "query_prompt": feed.query_prompt,
-                "articles": [
-                    {
-                        "title": x.item.title,
-                        "url": x.item.url,
-                        "summary": x.item.summary,
-                        "scores": x.scores
-                    } for x in news_curation_result.items
-                ]
-            })
-
-            logger.info(f"Successfully curated {len(news_curation_result.items)} articles for feed {feed.id} with query prompt {feed.query_prompt}")
-            return {"articles_curated": list(map(lambda x: x.item, news_curation_result.items))}
+            curated_articles = await _curate_articles(state["feed_id"], state["feed_query_prompt"], state["articles_curated"], min_relevance_score, max_articles_per_batch)
+            return {"articles_curated": curated_articles}
 
         except Exception as e:
             state["error_message"] = str(e)
@@ -181,17 +294,8 @@ def curate_articles_node(min_relevance_score: float, max_articles_per_batch: int
 
 async def save_news_articles_to_feed_node(state: PopulateFeedState):
     articles = state["articles_curated"]
-    db = get_db()
-    feed = db.query(NewsFeed).filter(NewsFeed.id == state["feed_id"]).first()
-    db_articles = db.query(DBNewsArticle).filter(DBNewsArticle.url.in_(list(map(lambda x: x.url, articles)))).all()
-    if not feed:
-        raise ValueError(f"Feed with ID {state['feed_id']} not found")
     
-    for db_article in db_articles:
-        feed_item = NewsFeedItem(
-            news_feed_id=feed.id,
-            news_article_id=db_article.id,
-        )
-        db.add(feed_item)
+    # The feed was looked up when the workflow started, its ID and query prompt are carried in the state
+    await run_db(Storage.link_news_articles_to_feed, state["feed_id"], [article.url for article in articles])
 
     return {}
\ No newline at end of file
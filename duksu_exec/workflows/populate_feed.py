@@ -1,39 +1,50 @@
 import json
+from datetime import datetime, timedelta, timezone
+from functools import cache
+from typing import Optional
 from langgraph.graph import StateGraph, END
 from langgraph.types import Send
 
-from duksu_exec.storage.db import get_db
-from duksu_exec.storage.model import NewsFeed
+from duksu_exec.config import CONFIG
+from duksu_exec.storage.db import Storage, run_db
 from .state import PopulateFeedState
 from .nodes.news_feed_manager import (
     create_news_search_plans_node, 
     curate_articles_node,
-    retrieve_articles_node,
     read_and_store_articles_node,
+    reduce_title_curated_articles_node,
+    retrieve_and_curate_articles_node,
     save_news_articles_to_feed_node
 )
 
 
 def continue_to_retrieve_articles(state: PopulateFeedState):
-    # Create parallel branches for retrieving articles from each news source
-    return [Send("retrieve_articles", {"news_search_plan": s}) for s in state["news_search_plans"]]
+    # Create parallel branches for retrieving and curating articles from each news source
+    return [
+        Send("retrieve_and_curate_articles_with_title", {
+            "news_search_plan": s,
+            "feed_id": state["feed_id"],
+            "feed_query_prompt": state["feed_query_prompt"],
+        })
+        for s in state["news_search_plans"]
+    ]
 
 
+# The graph is static, compile it once per process and share it across runs
+@cache
 def create_populate_feed_workflow():
     workflow = StateGraph(PopulateFeedState)
     
     workflow.add_node("create_search_plans", create_news_search_plans_node)
-    workflow.add_node("retrieve_articles", retrieve_articles_node)
-    workflow.add_node("reduce_retrieved_articles", lambda state: {"articles_curated": state["articles_retrieved"]})
-    workflow.add_node("curate_articles_with_title", curate_articles_node(min_relevance_score=0.8, max_articles_per_batch=30))
+    workflow.add_node("retrieve_and_curate_articles_with_title", retrieve_and_curate_articles_node(min_relevance_score=0.8, max_articles_per_batch=30))
+    workflow.add_node("reduce_title_curated_articles", reduce_title_curated_articles_node)
     workflow.add_node("curate_articles_with_full_content", curate_articles_node(min_relevance_score=0.6, max_articles_per_batch=20))
     workflow.add_node("read_and_store_articles", read_and_store_articles_node)
     workflow.add_node("save_news_articles_to_feed", save_news_articles_to_feed_node)
     
-    workflow.add_conditional_edges("create_search_plans", continue_to_retrieve_articles, ["retrieve_articles"]) # type: ignore
-    workflow.add_edge("retrieve_articles", "reduce_retrieved_articles")
-    workflow.add_edge("reduce_retrieved_articles", "curate_articles_with_title")
-    workflow.add_edge("curate_articles_with_title", "read_and_store_articles")
+    workflow.add_conditional_edges("create_search_plans", continue_to_retrieve_articles, ["retrieve_and_curate_articles_with_title"]) # type: ignore
+    workflow.add_edge("retrieve_and_curate_articles_with_title", "reduce_title_curated_articles")
+    workflow.add_edge("reduce_title_curated_articles", "read_and_store_articles")
     workflow.add_edge("read_and_store_articles", "curate_articles_with_full_content")
     workflow.add_edge("curate_articles_with_full_content", "save_news_articles_to_feed")
     workflow.add_edge("save_news_articles_to_feed", END)
@@ -42,30 +53,57 @@ def create_populate_feed_workflow():
     return workflow.compile()
 
 
-async def execute_populate_feed_workflow(feed_id: int):
+async def _populated_recently(feed_id: int) -> bool:
+    """Whether articles were saved to the feed within the minimum populate interval."""
+    min_interval = CONFIG.MIN_POPULATE_INTERVAL_SECONDS
+    if min_interval <= 0:
+        return False
+
+    last_populated_at = await run_db(Storage.get_news_feed_last_populated_at, feed_id)
+    return last_populated_at is not None and datetime.now(timezone.utc) - last_populated_at < timedelta(seconds=min_interval)
+
+
+async def execute_populate_feed_workflow(feed_id: int, feed_query_prompt: Optional[str] = None, force: bool = False):
+    """
+    Populate the feed, the query prompt can be passed if already loaded to skip looking up the feed.
+    Feeds populated within the minimum populate interval are skipped without running the workflow, unless forced.
+    """
     try:
-        db = get_db()
-        feed = db.query(NewsFeed).filter(NewsFeed.id == feed_id).first()
-        if not feed:
-            raise ValueError(f"Feed with id {feed_id} not found")
+        if feed_query_prompt is None:
+            feed_query_prompt = await run_db(Storage.get_news_feed_query_prompt, feed_id)
+            if feed_query_prompt is None:
+                raise ValueError(f"Feed with id {feed_id} not found")
+
+        if not force and await _populated_recently(feed_id):
+            return {
+                "feed_id": feed_id,
+                "feed_query_prompt": feed_query_prompt,
+                "news_search_plans": [],
+                "articles_retrieved": 0,
+                "articles_curated": 0,
+                "skipped": True,
+                "error_message": None
+            }
 
         # Get search plans first
         initial_state: PopulateFeedState = {
-            "feed_id": getattr(feed, "id"),
-            "feed_query_prompt": getattr(feed, "query_prompt"),
+            "feed_id": feed_id,
+            "feed_query_prompt": feed_query_prompt,
             "news_search_plans": [],
             "articles_retrieved": [],
+            "articles_title_curated": [],
             "articles_curated": [],
             "error_message": None
         }
 
         result = await create_populate_feed_workflow().ainvoke(initial_state)
         return {
-            "feed_id": feed.id,
-            "feed_query_prompt": feed.query_prompt,
+            "feed_id": feed_id,
+            "feed_query_prompt": feed_query_prompt,
             "news_search_plans": result["news_search_plans"],
             "articles_retrieved": len(result["articles_retrieved"]),
             "articles_curated": len(result["articles_curated"]),
+            "skipped": False,
             "error_message": result["error_message"]
         }
             
@@ -1,8 +1,14 @@
-import operator
 from typing import Annotated, TypedDict, List, Optional
 
-from duksu.news.model import NewsArticle
+from duksu.news.model import NewsArticle, drop_duplicate_articles
 from duksu.news.source.registry import NewsSearchPlan
+from duksu.utils.url import normalize_url
+
+
+def add_unique_articles(articles: List[NewsArticle], new_articles: List[NewsArticle]) -> List[NewsArticle]:
+    """Reducer adding the new articles that aren't already collected, by normalized URL."""
+    seen_urls = {normalize_url(article.url) for article in articles}
+    return articles + drop_duplicate_articles(new_articles, seen_urls)
 
 
 class BaseState(TypedDict):
@@ -21,5 +27,6 @@ class PopulateFeedState(BaseState):
     feed_id: int
     feed_query_prompt: str
     news_search_plans: List[NewsSearchPlan]
-    articles_retrieved: Annotated[List[NewsArticle], operator.add]
+    articles_retrieved: Annotated[List[NewsArticle], add_unique_articles]
+    articles_title_curated: Annotated[List[NewsArticle], add_unique_articles]  # Curated by title as each search plan's retrieval completes
     articles_curated: List[NewsArticle]
\ No newline at end of file
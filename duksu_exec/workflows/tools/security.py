@@ -18,6 +18,13 @@ class SecurityAnalysis(BaseModel):
     objective_reason: Optional[str] = Field(default=None, description="Brief explanation of objective alignment (only if objective provided)")
 
 
+# The format instructions only depend on the output schema, so they are generated once for all agents
+_FORMAT_INSTRUCTIONS = PydanticOutputParser(pydantic_object=SecurityAnalysis).get_format_instructions()
+
+# Stands in for the user input when the template is rendered ahead of time
+_USER_INPUT_SENTINEL = "\x00USER_INPUT\x00"
+
+
 class SecurePromptAgent:
     """Agent that analyzes prompts for security threats and objective alignment using LLM."""
     
@@ -31,8 +38,11 @@ class SecurePromptAgent:
         self.prompt_template = PromptTemplate(
             template=self._create_prompt_template(),
             input_variables=["user_input"],
-            partial_variables={"format_instructions": self.parser.get_format_instructions()}
+            partial_variables={"format_instructions": _FORMAT_INSTRUCTIONS}
         )
+        
+        # Render the template once around the user input, so prompts are built by concatenation
+        self._prompt_prefix, self._prompt_suffix = self.prompt_template.format(user_input=_USER_INPUT_SENTINEL).split(_USER_INPUT_SENTINEL)
     
     def _create_prompt_template(self) -> str:
         """Create the prompt template for security analysis."""
@@ -63,7 +73,7 @@ Content to analyze:
     
     async def analyze(self, user_input: str) -> SecurityAnalysis:
         sanitized_input = user_input.replace(self.delimiter, "[REMOVED_DELIMITER]")
-        prompt = self.prompt_template.format(user_input=sanitized_input)
+        prompt = self._prompt_prefix + sanitized_input + self._prompt_suffix
         
         response = await self.llm.ainvoke(prompt)
         
@@ -0,0 +1,9 @@
+import pytest
+
+from duksu.config import get_llm
+
+
+# The LLM client is stateless across tests, so it is created once for the whole test session
+@pytest.fixture(scope="session")
+def llm_model():
+    return get_llm(temperature=0.0)
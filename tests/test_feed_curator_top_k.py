@@ -0,0 +1,70 @@
+import pytest
+import asyncio
+from typing import Dict, List, Set
+
+from duksu.feed import curator as curator_module
+from duksu.feed.curator import FeedCurator
+from duksu.feed.scorer import Score, ScorerResponse
+from duksu.news.model import NewsArticle
+
+
+class FakeLLM:
+    """Language model standing in for the curator's, which is never called."""
+
+    def with_structured_output(self, schema):
+        return self
+
+
+class FakeScorer:
+    """Scorer returning fixed scores by URL, scoring the batches starting with a slow URL last."""
+
+    def __init__(self, scores: Dict[str, float], slow_urls: Set[str] = set()):
+        self.scores = scores
+        self.slow_urls = slow_urls
+        self.scored_urls: List[str] = []
+
+    async def ascore_articles(self, articles: List[NewsArticle], query_prompt: str) -> ScorerResponse:
+        if articles[0].url in self.slow_urls:
+            await asyncio.sleep(0.2)
+
+        self.scored_urls.extend(article.url for article in articles)
+        return ScorerResponse(scores=[Score(score=self.scores[article.url], reasoning="test") for article in articles])
+
+
+def create_articles(count: int) -> List[NewsArticle]:
+    return [NewsArticle(title=f"Article {i}", url=f"https://example.com/{i}", published_at=0, source="Test") for i in range(count)]
+
+
+class TestFeedCuratorTopK:
+
+    @pytest.fixture
+    def curator(self, monkeypatch) -> FeedCurator:
+        # Each test sets its fake scorer, the real one is not built as it loads the tokenizer
+        monkeypatch.setattr(curator_module, "RelevanceScorer", lambda llm, system_prompt: None)
+        return FeedCurator(llm=FakeLLM())  # type: ignore
+
+    @pytest.mark.asyncio
+    async def test_top_k_keeps_most_relevant_articles_in_order(self, curator):
+        """Test that only the top_k most relevant articles are kept, most relevant first."""
+        articles = create_articles(6)
+        curator.relevancy_scorer = FakeScorer({article.url: score for article, score in zip(articles, [0.6, 0.9, 0.7, 0.3, 0.8, 0.95])})
+
+        curation = await curator.curate_news_feed("AI news", articles, min_relevance_score=0.5, max_articles_per_batch=2, top_k=3)
+
+        assert [item.item.url for item in curation.items] == [articles[5].url, articles[1].url, articles[4].url]
+        assert [item.scores["relevance"]["score"] for item in curation.items] == [0.95, 0.9, 0.8]
+
+    @pytest.mark.asyncio
+    async def test_top_k_stops_scoring_once_enough_perfect_articles_found(self, curator):
+        """Test that the remaining batches are not scored once top_k perfectly relevant articles are found."""
+        articles = create_articles(6)
+        scorer = FakeScorer(
+            {article.url: score for article, score in zip(articles, [1.0, 1.0, 0.9, 0.9, 0.8, 0.8])},
+            slow_urls={articles[2].url, articles[4].url}
+        )
+        curator.relevancy_scorer = scorer
+
+        curation = await curator.curate_news_feed("AI news", articles, min_relevance_score=0.5, max_articles_per_batch=2, top_k=2)
+
+        assert [item.item.url for item in curation.items] == [articles[0].url, articles[1].url]
+        assert scorer.scored_urls == [articles[0].url, articles[1].url]
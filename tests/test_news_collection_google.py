@@ -1,11 +1,17 @@
 import pytest
 import asyncio
 import aiohttp
-import json
+import orjson
 import os
+import re
+from dataclasses import asdict
+from datetime import datetime, timezone
+from lxml import etree
 from pathlib import Path
+from typing import Dict, List
 from urllib.parse import urlencode
 
+from duksu.news.model import NewsArticle
 from duksu.news.source.rss.google_news import (
     GoogleNewsParam,
     GoogleNewsSearchParam,
@@ -14,6 +20,49 @@ from duksu.news.source.rss.google_news import (
 )
 
 
+SEARCH_CACHE_DIR = Path("tests/.cache/google_news")
+
+
+def _build_source_urls() -> Dict[str, str]:
+    """Build the URLs of all topic-based sources and of a search-based source."""
+    param = GoogleNewsParam(language="en", country="US")
+    topics = ["world", "business", "technology", "entertainment", "sports", "science", "health"]
+    urls = {topic: get_google_news_rss_url(topic, param) for topic in topics}
+    
+    search_param = GoogleNewsSearchParam(search_keyword="python programming")
+    search_url = "https://news.google.com/rss/search"
+    params = {
+        "q": search_param.search_keyword,
+        "hl": f"{search_param.language}-{search_param.country}",
+        "gl": search_param.country,
+        "ceid": f"{search_param.country}:{search_param.language}"
+    }
+    urls["search"] = f"{search_url}?{urlencode(params)}"
+    return urls
+
+
+# The source URLs only depend on constant parameters, so they are built once at import
+SOURCE_URLS = _build_source_urls()
+
+
+async def cached_google_news_search(search_param: GoogleNewsSearchParam) -> List[NewsArticle]:
+    """
+    Search Google News, reusing the results cached on disk for the same keyword on the same (UTC) day.
+    Set LIVE to always fetch fresh results.
+    """
+    date_bucket = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    cache_key = re.sub(r"\W+", "_", f"{search_param.search_keyword}_{search_param.language}_{search_param.country}")
+    cache_file = SEARCH_CACHE_DIR / f"{cache_key}_{date_bucket}.json"
+    
+    if cache_file.exists() and not os.getenv("LIVE"):
+        return [NewsArticle(**article) for article in orjson.loads(cache_file.read_bytes())]
+    
+    articles = await google_news_search(search_param)
+    SEARCH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cache_file.write_bytes(orjson.dumps([asdict(article) for article in articles]))
+    return articles
+
+
 class TestGoogleNewsRSS:
     
     @pytest.fixture
@@ -26,49 +75,32 @@ class TestGoogleNewsRSS:
     @pytest.mark.asyncio
     async def test_all_google_news_sources_return_valid_xml(self):
         """Test that all Google News source URLs return valid XML responses."""
-        param = GoogleNewsParam(language="en", country="US")
-        
-        # Test all topic-based sources
-        topics = ["world", "business", "technology", "entertainment", "sports", "science", "health"]
+        urls = SOURCE_URLS
         
-        async with aiohttp.ClientSession() as session:
-            for topic in topics:
-                url = get_google_news_rss_url(topic, param)
-                
-                async with session.get(url) as response:
-                    assert response.status == 200, f"Failed to fetch {topic} news: HTTP {response.status}"
-                    
-                    content = await response.text()
-                    assert content.strip().startswith('<?xml'), f"{topic} response is not XML"
-                    assert '<rss' in content, f"{topic} response is not RSS format"
-                    assert '</rss>' in content, f"{topic} response is incomplete RSS"
+        async def fetch(session: aiohttp.ClientSession, url: str):
+            async with session.get(url) as response:
+                return response.status, await response.read()
         
-        # Test search-based source
-        search_param = GoogleNewsSearchParam(search_keyword="python programming")
-        search_url = "https://news.google.com/rss/search"
-        params = {
-            "q": search_param.search_keyword,
-            "hl": f"{search_param.language}-{search_param.country}",
-            "gl": search_param.country,
-            "ceid": f"{search_param.country}:{search_param.language}"
-        }
-        search_url = f"{search_url}?{urlencode(params)}"
+        # Fetch all sources concurrently over one session, reusing its connections to Google News
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=16, ttl_dns_cache=300)) as session:
+            responses = await asyncio.gather(*(fetch(session, url) for url in urls.values()))
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(search_url) as response:
-                assert response.status == 200, f"Failed to fetch search news: HTTP {response.status}"
-                
-                content = await response.text()
-                assert content.strip().startswith('<?xml'), "Search response is not XML"
-                assert '<rss' in content, "Search response is not RSS format"
-                assert '</rss>' in content, "Search response is incomplete RSS"
+        for name, (status, content) in zip(urls, responses):
+            assert status == 200, f"Failed to fetch {name} news: HTTP {status}"
+            
+            # Parsing validates the response is complete, well-formed XML
+            try:
+                root = etree.fromstring(content)
+            except etree.XMLSyntaxError as e:
+                pytest.fail(f"{name} response is not valid XML: {e}")
+            assert root.tag == "rss", f"{name} response is not RSS format"
     
     @pytest.mark.asyncio
     async def test_google_news_fetch_articles_and_validate(self, output_dir):
         """Test fetching news and validate article fields."""
         search_param = GoogleNewsSearchParam(search_keyword="artificial intelligence")
         
-        articles = await google_news_search(search_param)
+        articles = await cached_google_news_search(search_param)
         
         assert len(articles) > 0, "No articles returned from Google News Search"
         
@@ -89,13 +121,12 @@ class TestGoogleNewsRSS:
                 "published_at": article.published_at,
             })
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "test_name": "Google News Search Integration Test",
-                "search_keyword": search_param.search_keyword,
-                "total_articles": len(articles),
-                "articles": articles_data
-            }, f, indent=2, ensure_ascii=False)
+        output_file.write_bytes(orjson.dumps({
+            "test_name": "Google News Search Integration Test",
+            "search_keyword": search_param.search_keyword,
+            "total_articles": len(articles),
+            "articles": articles_data
+        }, option=orjson.OPT_INDENT_2))
         
         print(f"✓ Successfully fetched {len(articles)} search articles for '{search_param.search_keyword}'")
         print(f"✓ Output saved to: {output_file}")
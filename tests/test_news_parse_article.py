@@ -1,12 +1,14 @@
 import pytest
 import asyncio
-import json
+import hashlib
+import orjson
+import os
 from pathlib import Path
 import re
 
 from duksu.news.model import NewsArticle
 from duksu.news.parser import NewsArticleParser
-from duksu.config import get_llm, CONFIG
+from duksu.config import CONFIG
 
 
 class TestNewsArticleParser:
@@ -18,10 +20,6 @@ class TestNewsArticleParser:
         output_path.mkdir(parents=True, exist_ok=True)
         return output_path
     
-    @pytest.fixture
-    def llm_model(self):
-        return get_llm(temperature=0.0)
-    
     @pytest.fixture
     def sample_article(self):
         return NewsArticle(
@@ -63,13 +61,17 @@ class TestNewsArticleParser:
             "summary": parsed_article.summary,
             "author": parsed_article.author,
             "keywords": parsed_article.keywords,
-            "content": parsed_article.content,
+            "content_length": len(parsed_article.content) if parsed_article.content else 0,
+            "content_sha256": hashlib.sha256(parsed_article.content.encode('utf-8')).hexdigest() if parsed_article.content else None,
             "has_raw_html": parsed_article.raw_html is not None,
             "raw_html_length": len(parsed_article.raw_html) if parsed_article.raw_html else 0,
         }
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(article_data, f, indent=2, ensure_ascii=False)
+        # The parsed content is only dumped on request, it is identified by its length and hash otherwise
+        if os.getenv("DUMP_FULL_CONTENT"):
+            article_data["content"] = parsed_article.content
+        
+        output_file.write_bytes(orjson.dumps(article_data, option=orjson.OPT_INDENT_2))
         
         print(f"Parser result saved to: {output_file}")
 
@@ -0,0 +1,86 @@
+import pytest
+import asyncio
+import threading
+from typing import List
+
+from duksu.feed.model import NewsCuration
+from duksu.news.model import NewsArticle
+from duksu.news.source import NewsSourceRegistry
+from duksu.news.source.registry import NewsSearchPlan
+from duksu_exec.storage import db as storage_db
+from duksu_exec.storage.db import Storage, get_db_session
+from duksu_exec.workflows.nodes import news_feed_manager
+from duksu_exec.workflows.nodes.news_feed_manager import retrieve_and_curate_articles_node
+
+
+class FakeSession:
+    """Session failing when it is used by two threads at the same time, as SQLAlchemy sessions must not be."""
+
+    def __init__(self):
+        self.is_active = True
+        self._in_use = threading.Lock()
+
+    def _use(self):
+        if not self._in_use.acquire(blocking=False):
+            raise RuntimeError("Session used concurrently")
+        try:
+            # Long enough for concurrent branches to overlap
+            threading.Event().wait(0.1)
+        finally:
+            self._in_use.release()
+
+    def scalars(self, *args, **kwargs):
+        self._use()
+        return []
+
+    def commit(self):
+        self._use()
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeCurator:
+    def __init__(self, llm):
+        pass
+
+    async def curate_news_feed(self, query_prompt: str, **kwargs) -> NewsCuration:
+        return NewsCuration(query_prompt=query_prompt)
+
+
+class TestPopulateFeedBranches:
+
+    @pytest.fixture(autouse=True)
+    def fake_dependencies(self, monkeypatch):
+        async def retrieve_news_articles_from_source(source_name: str, params: dict) -> List[NewsArticle]:
+            return [NewsArticle(title=f"{source_name} article", url=f"https://example.com/{source_name}", published_at=0, source=source_name)]
+
+        async def store_curation_result(content: dict) -> None:
+            pass
+
+        monkeypatch.setattr(storage_db, "SessionLocal", FakeSession)
+        monkeypatch.setattr(NewsSourceRegistry, "retrieve_news_articles_from_source", retrieve_news_articles_from_source)
+        monkeypatch.setattr(Storage, "store_curation_result", store_curation_result)
+        monkeypatch.setattr(news_feed_manager, "FeedCurator", FakeCurator)
+        monkeypatch.setattr(news_feed_manager, "get_llm", lambda: None)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_branches_use_separate_sessions(self):
+        """Test that search plan branches running at once don't share the workflow's database session."""
+        node = retrieve_and_curate_articles_node(min_relevance_score=0.5, max_articles_per_batch=10)
+
+        def branch_state(source_name: str) -> dict:
+            return {
+                "feed_id": 1,
+                "feed_query_prompt": "AI news",
+                "news_search_plan": NewsSearchPlan(source_name=source_name, parameters="{}", reasoning="test"),
+            }
+
+        # The workflow's session, as registered by populate-all-feeds
+        with get_db_session():
+            results = await asyncio.gather(node(branch_state("first")), node(branch_state("second")))
+
+        assert [len(result["articles_retrieved"]) for result in results] == [1, 1]
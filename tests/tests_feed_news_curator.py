@@ -1,17 +1,28 @@
 import pytest
 import asyncio
-import json
+import orjson
 from pathlib import Path
 from typing import List
 
 from duksu.news.model import NewsArticle
 from duksu.feed.curator import FeedCurator
 from duksu.feed.model import Feed
-from duksu.config import get_llm
 
 
 class TestFeedCurator:
     
+    def _count_items_matching_keywords(self, feed: Feed, keywords: List[str]) -> int:
+        """Count the feed items whose title contains a keyword, or whose article keywords are part of a keyword."""
+        keywords = [keyword.lower() for keyword in keywords]
+        
+        count = 0
+        for item in feed.items:
+            title = item.item.title.lower()
+            item_keywords = [kw.lower() for kw in (item.item.keywords or [])]
+            if any(keyword in title or any(kw in keyword for kw in item_keywords) for keyword in keywords):
+                count += 1
+        return count
+    
     def _feed_to_output_format(self, feed: Feed) -> dict:
         """Helper function to transform Feed object to output format for saving."""
         return {
@@ -43,16 +54,12 @@ class TestFeedCurator:
         output_path.mkdir(parents=True, exist_ok=True)
         return output_path
     
-    @pytest.fixture
-    def llm_model(self):
-        return get_llm(temperature=0.0)
-    
-    @pytest.fixture
+    # The dataset is only read, so it is loaded once for all tests of the class
+    @pytest.fixture(scope="class")
     def sample_articles(self) -> List[NewsArticle]:
         data_file = Path("tests/datasets/news_articles.json")
         
-        with open(data_file, 'r', encoding='utf-8') as f:
-            articles_data = json.load(f)
+        articles_data = orjson.loads(data_file.read_bytes())
         
         articles = []
         for article_data in articles_data:
@@ -91,12 +98,7 @@ class TestFeedCurator:
         
         # Verify AI-related articles are prioritized
         ai_keywords = ["AI", "artificial intelligence", "machine learning", "OpenAI", "GPT"]
-        ai_articles_count = sum(
-            1 for item in curated_feed.items 
-            if any(keyword.lower() in item.item.title.lower() or 
-                   any(kw.lower() in keyword.lower() for kw in (item.item.keywords or []))
-                   for keyword in ai_keywords)
-        )
+        ai_articles_count = self._count_items_matching_keywords(curated_feed, ai_keywords)
         
         assert ai_articles_count > 0, "Feed should contain AI-related articles"
         assert len(curated_feed.items) <= 3, "Should respect max_articles limit"
@@ -107,8 +109,7 @@ class TestFeedCurator:
 
         print(f"== Curator generated feed: {feed_data}")
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(feed_data, f, indent=2, ensure_ascii=False)
+        output_file.write_bytes(orjson.dumps(feed_data, option=orjson.OPT_INDENT_2))
         
         print(f"✓ Successfully curated AI feed: '{curated_feed.feed_name}'")
         print(f"✓ Output saved to: {output_file}")
@@ -134,12 +135,7 @@ class TestFeedCurator:
         
         # Verify sports-related articles are selected
         sports_keywords = ["soccer", "football", "basketball", "NBA", "MLS", "championship", "finals"]
-        sports_articles_count = sum(
-            1 for item in curated_feed.items 
-            if any(keyword.lower() in item.item.title.lower() or 
-                   any(kw.lower() in keyword.lower() for kw in (item.item.keywords or []))
-                   for keyword in sports_keywords)
-        )
+        sports_articles_count = self._count_items_matching_keywords(curated_feed, sports_keywords)
         
         assert sports_articles_count > 0, "Feed should contain sports-related articles"
         assert len(curated_feed.items) <= 3, "Should respect max_articles limit"
@@ -150,8 +146,7 @@ class TestFeedCurator:
 
         print(f"== Curator generated feed: {feed_data}")
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(feed_data, f, indent=2, ensure_ascii=False)
+        output_file.write_bytes(orjson.dumps(feed_data, option=orjson.OPT_INDENT_2))
         
         print(f"✓ Successfully curated sports feed: '{curated_feed.feed_name}'")
         print(f"✓ Output saved to: {output_file}")